@@ -7,9 +7,24 @@ import json
 import urllib.request
 import urllib.parse
 import urllib.error
-from typing import Dict, Any, Optional, Tuple, List
+from typing import Callable, Dict, Any, Optional, Tuple, List
 from .config import config
 
+# Try to import Qt networking for event-loop driven requests from the UI.
+# The PyQt bundled with KiCad often ships without OpenSSL; every API is HTTPS,
+# so only use Qt networking when it can do TLS and keep urllib otherwise
+try:
+    from PyQt5.QtCore import QUrl
+    from PyQt5.QtNetwork import QNetworkAccessManager, QNetworkReply, QNetworkRequest, QSslSocket
+    QT_NETWORK_AVAILABLE = QSslSocket.supportsSsl()
+except ImportError:
+    try:
+        from PyQt6.QtCore import QUrl
+        from PyQt6.QtNetwork import QNetworkAccessManager, QNetworkReply, QNetworkRequest, QSslSocket
+        QT_NETWORK_AVAILABLE = QSslSocket.supportsSsl()
+    except ImportError:
+        QT_NETWORK_AVAILABLE = False
+
 # Try to import KiCad operations for advanced features
 try:
     from .kicad_operations import kicad_ops
@@ -35,6 +50,11 @@ class AIAPIClient:
         self.design_memory = []  # Long-term memory of design decisions
         self.max_history_length = 20  # Keep last 20 exchanges
         self.max_memory_length = 50   # Keep last 50 design decisions
+        self._network_manager = None  # Created on first send_message_async
+    
+    def update_config(self, custom_config: Optional[Dict[str, Any]] = None):
+        """Replace the config overrides in place, keeping history and memory"""
+        self.config = custom_config or {}
     
     def _get_config_value(self, key: str, default: Any = None) -> Any:
         """Get configuration value from custom config or global config"""
@@ -223,133 +243,219 @@ You maintain context across our conversation and can reference previous discussi
         except Exception as e:
             return False, str(e)
     
-    def send_message(self, message: str, context: str = "") -> Optional[str]:
-        """Send message to AI API with memory and get response"""
-        try:
-            # Check for circuit generation requests first
-            is_circuit_request, circuit_info, circuit_data = self.identify_circuit_request(message)
-            
-            # Build memory context from conversation history
-            memory_context = self._build_memory_context()
-            
-            # Add circuit generation context if applicable
-            if is_circuit_request:
-                memory_context += f"\n\n## Circuit Generation Request Detected:\n{circuit_info}"
-                if circuit_data:
-                    template = circuit_data.get('template')
-                    if template:
-                        memory_context += f"\nTemplate: {template.name} ({template.estimated_layers} layers recommended)"
-            
-            # Store the user message in history
+    def _prepare_request(self, message: str, context: str = "") -> Tuple[str, str, Dict[str, str], bytes, bool, Dict[str, Any]]:
+        """Record the user turn and build (provider, url, headers, body, is_circuit_request, circuit_data)"""
+        # Check for circuit generation requests first
+        is_circuit_request, circuit_info, circuit_data = self.identify_circuit_request(message)
+        
+        # Build memory context from conversation history
+        memory_context = self._build_memory_context()
+        
+        # Add circuit generation context if applicable
+        if is_circuit_request:
+            memory_context += f"\n\n## Circuit Generation Request Detected:\n{circuit_info}"
+            if circuit_data:
+                template = circuit_data.get('template')
+                if template:
+                    memory_context += f"\nTemplate: {template.name} ({template.estimated_layers} layers recommended)"
+        
+        # Store the user message in history
+        self.session_history.append({
+            "role": "user",
+            "content": message,
+            "timestamp": self._get_timestamp(),
+            "context": context,
+            "circuit_request": is_circuit_request
+        })
+        
+        provider = self._get_config_value("api_provider", "claude")
+        
+        # Build request based on provider
+        if provider == "claude":
+            request_data = self._build_claude_request(message, context, memory_context)
+        elif provider in ["openai", "custom"]:
+            request_data = self._build_openai_request(message, context, memory_context)
+        else:
+            raise ValueError(f"Unsupported provider: {provider}")
+        
+        # Convert data to JSON
+        json_data = json.dumps(request_data).encode('utf-8')
+        
+        return provider, self._get_api_url(), self._get_headers(), json_data, is_circuit_request, circuit_data
+    
+    def _finish_response(self, provider: str, response_data: Dict[str, Any], message: str, context: str,
+                         is_circuit_request: bool, circuit_data: Dict[str, Any]) -> Optional[str]:
+        """Extract the reply text, run the circuit/PCB follow-ups and record the assistant turn"""
+        # Extract response text based on provider
+        ai_response = None
+        if provider == "claude":
+            if 'content' in response_data and len(response_data['content']) > 0:
+                ai_response = response_data['content'][0]['text']
+            else:
+                raise ValueError("Unexpected Claude API response format")
+        
+        elif provider in ["openai", "custom"]:
+            if 'choices' in response_data and len(response_data['choices']) > 0:
+                ai_response = response_data['choices'][0]['message']['content']
+            else:
+                raise ValueError("Unexpected OpenAI-compatible API response format")
+        
+        # Post-process response for circuit generation workflow
+        if ai_response and is_circuit_request and circuit_data:
+            # Generate the actual circuit and append to response
+            template = circuit_data.get('template')
+            if template:
+                success, circuit_result, generation_data = self.generate_circuit(template.name)
+                if success:
+                    ai_response += f"\n\n{generation_data['description']}"
+                    ai_response += f"\n\n{generation_data['schematic_instructions']}"
+                    ai_response += f"\n\n🤔 **Ready for PCB Layout?**\nThe circuit schematic is complete! Would you like me to proceed with creating the PCB layout? I'll automatically set up the optimal layer stackup and provide routing guidelines."
+        
+        # Check for PCB transition requests
+        elif ai_response:
+            pcb_transition, pcb_response = self.handle_pcb_transition_request(message)
+            if pcb_transition:
+                ai_response += f"\n\n{pcb_response}"
+            else:
+                # Check for layer approval
+                layer_approved, layer_response = self.handle_layer_approval(message)
+                if layer_approved:
+                    ai_response += f"\n\n{layer_response}"
+        
+        # Store AI response in history
+        if ai_response:
             self.session_history.append({
-                "role": "user",
-                "content": message,
+                "role": "assistant",
+                "content": ai_response,
                 "timestamp": self._get_timestamp(),
-                "context": context,
-                "circuit_request": is_circuit_request
+                "circuit_generated": is_circuit_request
             })
             
-            provider = self._get_config_value("api_provider", "claude")
-            
-            # Build request based on provider
-            if provider == "claude":
-                request_data = self._build_claude_request(message, context, memory_context)
-            elif provider in ["openai", "custom"]:
-                request_data = self._build_openai_request(message, context, memory_context)
-            else:
-                raise ValueError(f"Unsupported provider: {provider}")
-            
-            # Prepare HTTP request
-            url = self._get_api_url()
-            headers = self._get_headers()
-            
-            # Convert data to JSON
-            json_data = json.dumps(request_data).encode('utf-8')
+            # Extract and store design decisions for long-term memory
+            self._extract_design_decisions(message, ai_response, context)
             
-            # Create request
-            request = urllib.request.Request(url, data=json_data, headers=headers)
-            
-            # Send request
-            with urllib.request.urlopen(request, timeout=30) as response:
-                response_data = json.loads(response.read().decode('utf-8'))
-            
-            # Extract response text based on provider
-            ai_response = None
-            if provider == "claude":
-                if 'content' in response_data and len(response_data['content']) > 0:
-                    ai_response = response_data['content'][0]['text']
-                else:
-                    raise ValueError("Unexpected Claude API response format")
-            
-            elif provider in ["openai", "custom"]:
-                if 'choices' in response_data and len(response_data['choices']) > 0:
-                    ai_response = response_data['choices'][0]['message']['content']
-                else:
-                    raise ValueError("Unexpected OpenAI-compatible API response format")
-            
-            # Post-process response for circuit generation workflow
-            if ai_response and is_circuit_request and circuit_data:
-                # Generate the actual circuit and append to response
-                template = circuit_data.get('template')
-                if template:
-                    success, circuit_result, generation_data = self.generate_circuit(template.name)
-                    if success:
-                        ai_response += f"\n\n{generation_data['description']}"
-                        ai_response += f"\n\n{generation_data['schematic_instructions']}"
-                        ai_response += f"\n\n🤔 **Ready for PCB Layout?**\nThe circuit schematic is complete! Would you like me to proceed with creating the PCB layout? I'll automatically set up the optimal layer stackup and provide routing guidelines."
-            
-            # Check for PCB transition requests
-            elif ai_response:
-                pcb_transition, pcb_response = self.handle_pcb_transition_request(message)
-                if pcb_transition:
-                    ai_response += f"\n\n{pcb_response}"
-                else:
-                    # Check for layer approval
-                    layer_approved, layer_response = self.handle_layer_approval(message)
-                    if layer_approved:
-                        ai_response += f"\n\n{layer_response}"
-            
-            # Store AI response in history
-            if ai_response:
-                self.session_history.append({
-                    "role": "assistant",
-                    "content": ai_response,
-                    "timestamp": self._get_timestamp(),
-                    "circuit_generated": is_circuit_request
-                })
-                
-                # Extract and store design decisions for long-term memory
-                self._extract_design_decisions(message, ai_response, context)
-                
-                # Trim history if needed
-                self._trim_history()
-            
-            return ai_response
-            
-        except urllib.error.HTTPError as e:
-            error_msg = f"HTTP Error {e.code}: {e.reason}"
-            
-            # Try to get more detailed error message
-            try:
-                error_response = json.loads(e.read().decode('utf-8'))
-                if 'error' in error_response:
-                    if isinstance(error_response['error'], dict):
-                        error_msg += f" - {error_response['error'].get('message', '')}"
-                    else:
-                        error_msg += f" - {error_response['error']}"
-            except:
-                pass
-            
-            raise Exception(error_msg)
+            # Trim history if needed
+            self._trim_history()
         
-        except urllib.error.URLError as e:
-            raise Exception(f"Network error: {e.reason}")
+        return ai_response
+    
+    @staticmethod
+    def _format_http_error(code: int, reason: str, body: bytes) -> str:
+        """Build the error text for an HTTP error status, including the API's own message if any"""
+        error_msg = f"HTTP Error {code}: {reason}"
         
-        except json.JSONDecodeError as e:
-            raise Exception(f"Invalid JSON response: {e}")
+        # Try to get more detailed error message
+        try:
+            error_response = json.loads(body.decode('utf-8'))
+            if 'error' in error_response:
+                if isinstance(error_response['error'], dict):
+                    error_msg += f" - {error_response['error'].get('message', '')}"
+                else:
+                    error_msg += f" - {error_response['error']}"
+        except:
+            pass
+        
+        return error_msg
+    
+    def _describe_error(self, e: Exception) -> str:
+        """Error text for a failure while sending a request or handling its reply"""
+        if isinstance(e, urllib.error.HTTPError):
+            return self._format_http_error(e.code, e.reason, e.read())
+        if isinstance(e, urllib.error.URLError):
+            return f"Network error: {e.reason}"
+        if isinstance(e, json.JSONDecodeError):
+            return f"Invalid JSON response: {e}"
+        return f"API call failed: {e}"
+    
+    def _send_prepared(self, prepared: Tuple, message: str, context: str) -> Optional[str]:
+        """POST a request from _prepare_request with urllib and finish its response (blocking)"""
+        provider, url, headers, json_data, is_circuit_request, circuit_data = prepared
+        
+        # Create request
+        request = urllib.request.Request(url, data=json_data, headers=headers)
+        
+        # Send request
+        with urllib.request.urlopen(request, timeout=30) as response:
+            response_data = json.loads(response.read().decode('utf-8'))
+        
+        return self._finish_response(provider, response_data, message, context, is_circuit_request, circuit_data)
+    
+    def _deliver(self, produce: Callable[[], Optional[str]], on_done: Callable[[str], None],
+                 on_error: Callable[[str], None]):
+        """Run produce() and pass its reply to on_done, or its failure to on_error"""
+        try:
+            ai_response = produce()
+        except Exception as e:
+            on_error(self._describe_error(e))
+            return
         
+        if ai_response:
+            on_done(ai_response)
+        else:
+            on_error("No response received from API")
+    
+    def send_message(self, message: str, context: str = "") -> Optional[str]:
+        """Send message to AI API with memory and get response"""
+        try:
+            prepared = self._prepare_request(message, context)
+            return self._send_prepared(prepared, message, context)
         except Exception as e:
-            raise Exception(f"API call failed: {e}")
+            raise Exception(self._describe_error(e))
+    
+    def send_message_async(self, message: str, context: str, on_done: Callable[[str], None],
+                           on_error: Callable[[str], None], run_blocking: Callable[[Callable[[], None]], None]):
+        """Send a message through Qt's event loop instead of blocking a worker on the network.
+        
+        Must be called from the Qt GUI thread. run_blocking(fn) must run fn off the
+        GUI thread; it is used for handling the reply (circuit generation and layer
+        follow-ups can be slow) and for retrying with urllib when Qt networking
+        fails, e.g. on TLS problems. on_done and on_error may therefore be called
+        from any thread.
+        """
+        try:
+            prepared = self._prepare_request(message, context)
+        except Exception as e:
+            on_error(self._describe_error(e))
+            return
+        provider, url, headers, json_data, is_circuit_request, circuit_data = prepared
+        
+        if self._network_manager is None:
+            self._network_manager = QNetworkAccessManager()
+        
+        request = QNetworkRequest(QUrl(url))
+        for name, value in headers.items():
+            request.setRawHeader(name.encode('utf-8'), value.encode('utf-8'))
+        if hasattr(request, "setTransferTimeout"):  # Qt 5.15+
+            request.setTransferTimeout(30000)
+        
+        reply = self._network_manager.post(request, json_data)
+        
+        def finished():
+            try:
+                status = reply.attribute(QNetworkRequest.Attribute.HttpStatusCodeAttribute)
+                body = bytes(reply.readAll())
+                network_failed = status is None and reply.error() != QNetworkReply.NetworkError.NoError
+                reason = reply.attribute(QNetworkRequest.Attribute.HttpReasonPhraseAttribute) or ""
+            finally:
+                reply.deleteLater()
+            
+            if network_failed:
+                # No HTTP response at all (TLS, proxy, DNS...); urllib may still get through
+                run_blocking(lambda: self._deliver(
+                    lambda: self._send_prepared(prepared, message, context), on_done, on_error))
+                return
+            if status is not None and status >= 400:
+                on_error(self._format_http_error(status, reason, body))
+                return
+            
+            def finish_body() -> Optional[str]:
+                response_data = json.loads(body.decode('utf-8'))
+                return self._finish_response(provider, response_data, message, context,
+                                             is_circuit_request, circuit_data)
+            
+            run_blocking(lambda: self._deliver(finish_body, on_done, on_error))
+        
+        reply.finished.connect(finished)
     
     def send_message_with_history(self, message: str, context: str = "") -> Optional[str]:
         """Send message with conversation history (for future enhancement)"""
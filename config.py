@@ -51,6 +51,8 @@ class ConfigManager:
             "chat_history_limit": 50,
             "auto_detect_context": True,
             "include_drc_errors": True,
+            "chat_view": "rich",  # rich, plain, or list
+            "always_on_top": False,
             "theme": "default"
         }
         
@@ -92,6 +94,13 @@ class ConfigManager:
         self.config_data[key] = value
         return self._save_config(self.config_data)
     
+    def update(self, values: Dict[str, Any]) -> bool:
+        """Set several configuration values and save once"""
+        if "api_provider" in values:
+            self._validate_provider(values["api_provider"])
+        self.config_data.update(values)
+        return self._save_config(self.config_data)
+    
     def get_api_key(self) -> str:
         """Get the API key"""
         return self.config_data.get("api_key", "")
@@ -114,10 +123,15 @@ class ConfigManager:
     
     def set_api_provider(self, provider: str) -> bool:
         """Set the API provider"""
+        self._validate_provider(provider)
+        return self.set("api_provider", provider)
+    
+    @staticmethod
+    def _validate_provider(provider: str):
+        """Raise ValueError for unknown API providers"""
         valid_providers = ["claude", "openai", "custom"]
         if provider not in valid_providers:
             raise ValueError(f"Invalid provider. Must be one of: {valid_providers}")
-        return self.set("api_provider", provider)
     
     def get_api_base_url(self) -> str:
         """Get the API base URL"""
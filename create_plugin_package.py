@@ -11,6 +11,8 @@ from pathlib import Path
 import tempfile
 import hashlib
 
+from setup import ESSENTIAL_FILES
+
 def calculate_sha256(file_path):
     """Calculate SHA256 hash of a file"""
     sha256_hash = hashlib.sha256()
@@ -22,19 +24,8 @@ def calculate_sha256(file_path):
 def create_plugin_package():
     """Create a minimal plugin package"""
     
-    # Essential plugin files only
-    essential_files = [
-        "__init__.py",
-        "main.py", 
-        "ui.py",
-        "AI_API.py",
-        "config.py",
-        "enhanced_parser.py",
-        "kicad_operations.py",
-        "circuit_generator.py",
-        "permissions.py",
-        "parser.py"
-    ]
+    # Essential plugin files only (same list setup.py installs)
+    essential_files = ESSENTIAL_FILES
     
     # Essential directories
     essential_dirs = [
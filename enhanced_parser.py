@@ -5,9 +5,12 @@ Extracts comprehensive design information and provides modification capabilities
 
 import os
 import sys
+from collections import defaultdict
 from typing import Dict, List, Any, Optional, Tuple, Callable
 from pathlib import Path
 
+from .parser import board_cache_key
+
 
 try:
     import pcbnew
@@ -57,6 +60,12 @@ class EnhancedKiCadParser:
         self.current_schematic = None
         self.pending_modifications = []
         self.applied_modifications = []
+        # (cache key, context) from the last get_comprehensive_context()
+        self._ctx_cache: Tuple[Optional[tuple], Optional[str]] = (None, None)
+    
+    def bump_cache(self):
+        """Invalidate cached context (call after modifying the board)"""
+        self._ctx_cache = (None, None)
         
     def get_comprehensive_context(self) -> str:
         """Get comprehensive design context including all PCB design aspects"""
@@ -68,6 +77,11 @@ class EnhancedKiCadParser:
             if not board:
                 return "No active PCB design found."
             
+            # Reuse the last context while the saved board file is unchanged
+            key = board_cache_key(board)
+            if key is not None and self._ctx_cache[0] == key:
+                return self._ctx_cache[1]
+            
             context_parts = []
             
             # Basic design information
@@ -100,7 +114,10 @@ class EnhancedKiCadParser:
             # Footprint analysis
             context_parts.append(self._get_footprint_analysis(board))
             
-            return "\n\n".join(context_parts)
+            context = "\n\n".join(context_parts)
+            if key is not None:
+                self._ctx_cache = (key, context)
+            return context
             
         except Exception as e:
             return f"Error accessing comprehensive KiCad context: {str(e)}"
@@ -204,7 +221,7 @@ class EnhancedKiCadParser:
         """Get detailed component analysis"""
         try:
             components = []
-            component_types = {}
+            component_types = defaultdict(lambda: {"count": 0, "components": []})
             power_components = []
             critical_components = []
             
@@ -224,8 +241,6 @@ class EnhancedKiCadParser:
                 
                 # Component type analysis
                 ref_prefix = ''.join(filter(str.isalpha, ref))
-                if ref_prefix not in component_types:
-                    component_types[ref_prefix] = {"count": 0, "components": []}
                 component_types[ref_prefix]["count"] += 1
                 component_types[ref_prefix]["components"].append({
                     "ref": ref, "value": value, "footprint": fp_name,
@@ -268,7 +283,9 @@ class EnhancedKiCadParser:
             board_bbox = board.GetBoardEdgesBoundingBox()
             board_area_mm2 = pcbnew.ToMM(board_bbox.GetWidth()) * pcbnew.ToMM(board_bbox.GetHeight())
             if board_area_mm2 > 0:
-                density = len(list(board.GetFootprints())) / board_area_mm2 * 100  # components per cm²
+                footprints = board.GetFootprints()
+                footprint_count = footprints.size() if hasattr(footprints, 'size') else sum(1 for _ in footprints)
+                density = footprint_count / board_area_mm2 * 100  # components per cm²
                 result.append(f"\nComponent Density: {density:.1f} components/cm²")
             
             return "\n".join(result)
@@ -561,7 +578,7 @@ class EnhancedKiCadParser:
         try:
             result = ["=== FOOTPRINT ANALYSIS ==="]
             
-            footprint_libraries = {}
+            footprint_libraries = defaultdict(list)
             custom_footprints = []
             potential_issues = []
             
@@ -572,8 +589,6 @@ class EnhancedKiCadParser:
                 ref = footprint.GetReference()
                 
                 # Track library usage
-                if lib_name not in footprint_libraries:
-                    footprint_libraries[lib_name] = []
                 footprint_libraries[lib_name].append(fp_name)
                 
                 # Identify custom footprints (no library)
@@ -619,6 +634,7 @@ class EnhancedKiCadParser:
     def apply_modification(self, modification: DesignModification) -> bool:
         """Apply a proposed modification"""
         if modification.apply():
+            self.bump_cache()
             if modification in self.pending_modifications:
                 self.pending_modifications.remove(modification)
             self.applied_modifications.append(modification)
@@ -630,6 +646,7 @@ class EnhancedKiCadParser:
         if self.applied_modifications:
             last_mod = self.applied_modifications[-1]
             if last_mod.undo():
+                self.bump_cache()
                 self.applied_modifications.remove(last_mod)
                 return True
         return False
@@ -4,20 +4,27 @@ Installs Smart Cat AI Assistant in all detected KiCad versions
 """
 
 import os
+import re
 import shutil
+import sys
 from pathlib import Path
 
+# Shared install steps (setup.py sits next to this script)
+from setup import copy_plugin_files, prepare_staging, precompile_plugin, swap_into_place
+
+# Matches KiCad version directory names such as "7.0" or "9.0"
+_VER_RE = re.compile(r'^\d+(?:\.\d+)*$').match
+
 def get_kicad_versions():
     """Detect all installed KiCad versions"""
     kicad_base = Path.home() / "AppData" / "Roaming" / "kicad"
-    versions = []
     
-    if kicad_base.exists():
-        for item in kicad_base.iterdir():
-            if item.is_dir() and item.name.replace(".", "").isdigit():
-                versions.append(item.name)
+    if not kicad_base.exists():
+        return []
     
-    return sorted(versions)
+    # DirEntry.is_dir() uses the cached readdir type, avoiding a stat per entry
+    with os.scandir(kicad_base) as it:
+        return sorted(e.name for e in it if e.is_dir() and _VER_RE(e.name))
 
 def install_to_version(version):
     """Install plugin to specific KiCad version"""
@@ -29,35 +36,23 @@ def install_to_version(version):
     dest_dir = plugins_dir / "smart_cat"
     source_dir = Path(__file__).parent
     
-    print(f"Installing to KiCad {version}...")
-    print(f"  Target: {dest_dir}")
-    
-    # Remove existing installation
-    if dest_dir.exists():
-        shutil.rmtree(dest_dir)
-    
-    # Create destination
-    dest_dir.mkdir()
-    
-    # Essential files
-    essential_files = [
-        "__init__.py", "main.py", "ui.py", "AI_API.py", "config.py",
-        "enhanced_parser.py", "kicad_operations.py", "circuit_generator.py", 
-        "permissions.py", "parser.py"
-    ]
-    
-    # Copy files
-    for file_name in essential_files:
-        source_file = source_dir / file_name
-        if source_file.exists():
-            shutil.copy2(source_file, dest_dir / file_name)
-            print(f"    ✓ {file_name}")
+    # Collect progress lines and emit them with a single write at the end
+    lines = [f"Installing to KiCad {version}...", f"  Target: {dest_dir}"]
     
-    # Copy resources
-    resources_src = source_dir / "resources"
-    if resources_src.exists():
-        shutil.copytree(resources_src, dest_dir / "resources")
-        print(f"    ✓ resources/")
+    try:
+        # Same staged copy/compile/swap steps as setup.py install
+        staging_dir = prepare_staging(dest_dir)
+        
+        copied, _ = copy_plugin_files(source_dir, staging_dir)
+        lines.extend(f"    ✓ {name}" for name in copied)
+        
+        if not precompile_plugin(staging_dir):
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            raise RuntimeError("plugin files failed to compile")
+        
+        swap_into_place(staging_dir, dest_dir)
+    finally:
+        sys.stdout.write("\n".join(lines) + "\n")
     
     return True
 
@@ -5,6 +5,7 @@ Handles board settings, layer management, preferences, and advanced modification
 
 import os
 import sys
+from functools import lru_cache
 from typing import Dict, List, Any, Optional, Tuple, Callable
 from pathlib import Path
 
@@ -16,6 +17,46 @@ except ImportError:
     print("pcbnew module not available - advanced operations will be limited")
 
 
+@lru_cache(maxsize=1)
+def _layer_type_map() -> Dict[int, str]:
+    """Map KiCad layer IDs to layer types (layers not listed are "technical")
+    
+    Built on first use so a pcbnew build missing one of these constants can still
+    import this module.
+    """
+    if not PCBNEW_AVAILABLE:
+        return {}
+    
+    layer_types = {pcbnew.F_Cu: "copper_outer", pcbnew.B_Cu: "copper_outer"}
+    for layer_id in range(pcbnew.In1_Cu, pcbnew.In30_Cu + 1):
+        layer_types[layer_id] = "copper_inner"
+    layer_types.update({
+        pcbnew.F_SilkS: "silkscreen", pcbnew.B_SilkS: "silkscreen",
+        pcbnew.F_Mask: "solder_mask", pcbnew.B_Mask: "solder_mask",
+        pcbnew.F_Paste: "solder_paste", pcbnew.B_Paste: "solder_paste",
+        pcbnew.Edge_Cuts: "board_edge",
+        pcbnew.F_Fab: "fabrication", pcbnew.B_Fab: "fabrication",
+        pcbnew.Dwgs_User: "user", pcbnew.Cmts_User: "user"
+    })
+    return layer_types
+
+
+def _invalidate_context_cache():
+    """Drop cached design context after the board has been modified
+    
+    Layer count and design-settings setters don't touch the board's edit counter,
+    so both context parsers have to be told explicitly.
+    """
+    # Import here to avoid circular dependencies
+    try:
+        from .parser import parser
+        from .enhanced_parser import enhanced_parser
+    except ImportError:
+        return
+    parser.bump_cache()
+    enhanced_parser.bump_cache()
+
+
 class KiCadOperations:
     """Advanced KiCad operations including settings, preferences, and layer management"""
     
@@ -56,8 +97,8 @@ class KiCadOperations:
                 'min_track_width': design_settings.m_TrackMinWidth,
                 'min_via_size': design_settings.m_ViasMinSize,
                 'min_via_drill': design_settings.m_ViasMinDrill,
-                'enabled_layers': [layer for layer in range(pcbnew.PCB_LAYER_ID_COUNT) 
-                                 if board.IsLayerEnabled(layer)]
+                # One LSET fetch instead of an IsLayerEnabled probe per layer ID
+                'enabled_layers': frozenset(board.GetEnabledLayers().Seq())
             }
             
             return True
@@ -83,8 +124,16 @@ class KiCadOperations:
             design_settings.SetCurrentViaSize(self.backup_settings['via_size'])
             design_settings.SetCurrentViaDrill(self.backup_settings['via_drill'])
             
-            # Note: Layer count changes require more complex operations
-            # and may not be directly reversible
+            # Restore the enabled layer set and copper count. Routing placed on
+            # added layers is not moved back, so this is not a full undo.
+            # The bitset set() isn't exposed through SWIG; bindings name the method
+            # AddLayer or addLayer depending on the KiCad version
+            enabled_layers = pcbnew.LSET()
+            add_layer = getattr(enabled_layers, 'AddLayer', None) or enabled_layers.addLayer
+            for layer_id in self.backup_settings['enabled_layers']:
+                add_layer(layer_id)
+            board.SetEnabledLayers(enabled_layers)
+            board.SetCopperLayerCount(self.backup_settings['layer_count'])
             
             return True
             
@@ -107,17 +156,17 @@ class KiCadOperations:
                 "stackup_info": {}
             }
             
-            # Get all enabled layers
-            for layer_id in range(pcbnew.PCB_LAYER_ID_COUNT):
-                if board.IsLayerEnabled(layer_id):
-                    layer_info["total_layers"] += 1
-                    layer_name = board.GetLayerName(layer_id)
-                    layer_info["enabled_layers"].append({
-                        "id": layer_id, 
-                        "name": layer_name,
-                        "type": self._get_layer_type(layer_id)
-                    })
-                    layer_info["layer_names"][layer_id] = layer_name
+            # Walk only the enabled layers of the LSET instead of probing every layer ID
+            layer_types = _layer_type_map()
+            for layer_id in board.GetEnabledLayers().Seq():
+                layer_info["total_layers"] += 1
+                layer_name = board.GetLayerName(layer_id)
+                layer_info["enabled_layers"].append({
+                    "id": layer_id, 
+                    "name": layer_name,
+                    "type": layer_types.get(layer_id, "technical")
+                })
+                layer_info["layer_names"][layer_id] = layer_name
             
             return layer_info
             
@@ -126,25 +175,7 @@ class KiCadOperations:
     
     def _get_layer_type(self, layer_id: int) -> str:
         """Get the type of layer based on layer ID"""
-        # KiCad layer types
-        if layer_id in [pcbnew.F_Cu, pcbnew.B_Cu]:
-            return "copper_outer"
-        elif layer_id in range(pcbnew.In1_Cu, pcbnew.In30_Cu + 1):
-            return "copper_inner"
-        elif layer_id in [pcbnew.F_SilkS, pcbnew.B_SilkS]:
-            return "silkscreen"
-        elif layer_id in [pcbnew.F_Mask, pcbnew.B_Mask]:
-            return "solder_mask"
-        elif layer_id in [pcbnew.F_Paste, pcbnew.B_Paste]:
-            return "solder_paste"
-        elif layer_id == pcbnew.Edge_Cuts:
-            return "board_edge"
-        elif layer_id in [pcbnew.F_Fab, pcbnew.B_Fab]:
-            return "fabrication"
-        elif layer_id in [pcbnew.Dwgs_User, pcbnew.Cmts_User]:
-            return "user"
-        else:
-            return "technical"
+        return _layer_type_map().get(layer_id, "technical")
     
     def can_add_copper_layers(self, target_count: int) -> Tuple[bool, str]:
         """Check if copper layers can be added to reach target count"""
@@ -212,6 +243,7 @@ class KiCadOperations:
                 "timestamp": self._get_timestamp()
             }
             self.operation_history.append(operation)
+            _invalidate_context_cache()
             
             # Refresh the board
             pcbnew.Refresh()
@@ -280,6 +312,7 @@ class KiCadOperations:
                 "timestamp": self._get_timestamp()
             }
             self.operation_history.append(operation)
+            _invalidate_context_cache()
             
             # Refresh the board
             pcbnew.Refresh()
@@ -413,6 +446,7 @@ class KiCadOperations:
             # For now, use the backup settings restore
             # More sophisticated undo would require per-operation restore functions
             if self.restore_settings():
+                _invalidate_context_cache()
                 undone_op = self.operation_history.pop()
                 return True, f"Undone: {undone_op['type']} from {undone_op['timestamp']}"
             else:
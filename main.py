@@ -4,6 +4,8 @@ Smart Cat AI Assistant - Main KiCad Action Plugin Entry Point 🐱👓
 
 import sys
 import os
+from functools import lru_cache
+from types import MappingProxyType
 
 # Add plugin directory to path for imports
 plugin_dir = os.path.dirname(os.path.abspath(__file__))
@@ -12,7 +14,6 @@ if plugin_dir not in sys.path:
 
 try:
     import pcbnew
-    from .ui import SmartCatAssistantWindow
     from .config import config
 except ImportError as e:
     print(f"Import error in Smart Cat AI Assistant: {e}")
@@ -45,7 +46,8 @@ class SmartCatAIAssistantPlugin(pcbnew.ActionPlugin):
     def Run(self):
         """Main plugin execution - called when user clicks the plugin button"""
         try:
-            # Check if window already exists
+            # Reuse the window across runs - closing it only hides it, so
+            # reopening is a show() instead of rebuilding the widget tree
             if self.assistant_window is not None:
                 # Bring existing window to front
                 self.assistant_window.show()
@@ -53,15 +55,12 @@ class SmartCatAIAssistantPlugin(pcbnew.ActionPlugin):
                 self.assistant_window.activateWindow()
                 return
             
-            # Create new assistant window
+            # Create assistant window on first run. The Qt UI module is only
+            # imported here so registering the plugin at KiCad startup does
+            # not pay for loading PyQt and the widget classes
+            from .ui import SmartCatAssistantWindow
             self.assistant_window = SmartCatAssistantWindow()
             
-            # Set up window close event to clean up reference
-            def on_window_close():
-                self.assistant_window = None
-            
-            self.assistant_window.window_closed.connect(on_window_close)
-            
             # Show the assistant window
             self.assistant_window.show()
             
@@ -83,22 +82,26 @@ class SmartCatAIAssistantPlugin(pcbnew.ActionPlugin):
 # Don't register here to avoid conflicts
 
 
+@lru_cache(maxsize=1)
 def get_plugin_version():
     """Get plugin version"""
     return "1.0.0"
 
 
+_PLUGIN_INFO = MappingProxyType({
+    "name": "Smart Cat AI Assistant",
+    "version": get_plugin_version(),
+    "description": "AI-powered assistant for schematic and PCB design analysis with automatic circuit generation",
+    "author": "Smart Cat AI Team",
+    "license": "MIT",
+    "kicad_version": "7.0+",
+    "python_version": "3.6+"
+})
+
+
 def get_plugin_info():
-    """Get plugin information"""
-    return {
-        "name": "Smart Cat AI Assistant",
-        "version": get_plugin_version(),
-        "description": "AI-powered assistant for schematic and PCB design analysis with automatic circuit generation",
-        "author": "Smart Cat AI Team",
-        "license": "MIT",
-        "kicad_version": "7.0+",
-        "python_version": "3.6+"
-    }
+    """Get plugin information (read-only view, shared between calls)"""
+    return _PLUGIN_INFO
 
 
 # Plugin metadata for KiCad
@@ -4,7 +4,13 @@ Extracts design information from KiCad schematics and PCBs
 """
 
 import os
+import re
 import sys
+from array import array
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from importlib.util import find_spec
 from typing import Dict, List, Any, Optional, Tuple
 from pathlib import Path
 
@@ -16,6 +22,195 @@ except ImportError:
     PCBNEW_AVAILABLE = False
     print("pcbnew module not available - context parsing will be limited")
 
+# NumPy is optional - used to vectorize track statistics on large boards
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Numba is optional - used to JIT the net classification loop on large boards.
+# Only looked up here; importing it and compiling the kernel wait for the first
+# board big enough to need it, see _power_mask_kernel()
+NUMBA_AVAILABLE = NUMPY_AVAILABLE and find_spec("numba") is not None
+
+# Substrings (of the upper-cased net name) that mark a power net
+_POWER_KEYWORDS = ('VCC', 'VDD', 'VEE', 'VSS', 'GND', 'POWER', '+5V', '+3V3', '+12V', '-12V')
+
+# Cheap checks tried before the substring scan: common exact names and rail prefixes
+_POWER_EXACT = frozenset({'VCC', 'VDD', 'VEE', 'VSS', 'GND', 'POWER'})
+_POWER_PREFIX = ('+', '-')
+
+# Below this many nets the pure-Python check is faster than packing + JIT dispatch
+_NUMBA_MIN_NETS = 2000
+
+# KiCad 6+ internal units are nanometres; plain multiply avoids a SWIG call per value
+_NM_TO_MM = 1e-6
+if PCBNEW_AVAILABLE and getattr(pcbnew, 'IU_PER_MM', 1e6) != 1e6:
+    _NM_TO_MM = 1.0 / pcbnew.IU_PER_MM
+
+# Footprint count from which export_netlist_info() spreads pad extraction over threads
+_EXPORT_PARALLEL_MIN = 200
+_EXPORT_MAX_WORKERS = 4
+
+# File category by lowercase suffix, for get_project_files
+_SUFFIX_MAP = {
+    '.kicad_pcb': 'pcb',
+    '.kicad_sch': 'schematic',
+    '.kicad_sym': 'libraries',
+    '.lib': 'libraries',
+    '.gbr': 'gerbers',
+    '.drl': 'gerbers',
+    '.gko': 'gerbers',
+    '.gts': 'gerbers',
+    '.gbs': 'gerbers',
+}
+
+# Component type prefix of a reference designator ("R" in "R12", "PWR" in "#PWR01")
+_PREFIX_RE = re.compile(r'[A-Za-z]+')
+
+
+def _ref_prefix(reference: str) -> str:
+    """Get the component type prefix of a reference designator"""
+    match = _PREFIX_RE.search(reference)
+    return match.group(0) if match else ''
+
+
+def _track_stats(widths: array, lengths: array, limit: int = 5) -> Tuple[float, List[Tuple[float, int]]]:
+    """Total length and most common widths (mm) from raw track widths/lengths in nm"""
+    if NUMPY_AVAILABLE and len(widths):
+        total_length = float(np.frombuffer(lengths, dtype=np.int64).sum()) * _NM_TO_MM
+        widths_mm = np.round(np.frombuffer(widths, dtype=np.int64) * _NM_TO_MM, 3)
+        unique, counts = np.unique(widths_mm, return_counts=True)
+        top = np.argsort(-counts, kind="stable")[:limit]
+        return total_length, [(float(unique[i]), int(counts[i])) for i in top]
+    
+    total_length = sum(lengths) * _NM_TO_MM
+    width_counts = Counter(round(width * _NM_TO_MM, 3) for width in widths)
+    top = sorted(width_counts.items(), key=lambda item: (-item[1], item[0]))[:limit]
+    return total_length, top
+
+
+@lru_cache(maxsize=1)
+def _power_mask_kernel():
+    """Import numba and compile the net classifier on first use.
+    
+    Returns a function mapping (NUL-separated name buffer, name count) to a
+    power-net mask, or None if numba can't be loaded after all.
+    """
+    try:
+        from numba import njit
+    except ImportError:
+        return None
+    
+    # No cache=True: it would write compiled artifacts into the plugin directory
+    @njit
+    def kernel(buf, name_count, keywords, keyword_lengths):
+        """Flag the NUL-separated names in buf that contain any keyword"""
+        mask = np.zeros(name_count, dtype=np.bool_)
+        row = 0
+        for i in range(buf.shape[0]):
+            if buf[i] == 0:
+                row += 1
+                continue
+            if mask[row]:
+                continue
+            # Rail names start with '+' (43) or '-' (45)
+            if (i == 0 or buf[i - 1] == 0) and (buf[i] == 43 or buf[i] == 45):
+                mask[row] = True
+                continue
+            for k in range(keywords.shape[0]):
+                kw_len = keyword_lengths[k]
+                j = 0
+                while j < kw_len and i + j < buf.shape[0] and buf[i + j] == keywords[k, j]:
+                    j += 1
+                if j == kw_len:
+                    mask[row] = True
+                    break
+        return mask
+    
+    # Keywords as a zero-padded uint8 matrix, packed once
+    keyword_lengths = np.array([len(kw) for kw in _POWER_KEYWORDS], dtype=np.int64)
+    keyword_bytes = np.zeros((len(_POWER_KEYWORDS), keyword_lengths.max()), dtype=np.uint8)
+    for row, keyword in enumerate(_POWER_KEYWORDS):
+        keyword_bytes[row, :len(keyword)] = np.frombuffer(keyword.encode('ascii'), dtype=np.uint8)
+    
+    return lambda buf, name_count: kernel(buf, name_count, keyword_bytes, keyword_lengths)
+
+
+def _power_net_mask(net_names: List[str]) -> List[bool]:
+    """For each net name, whether it looks like a power net"""
+    kernel = _power_mask_kernel() if NUMBA_AVAILABLE and len(net_names) >= _NUMBA_MIN_NETS else None
+    if kernel is not None:
+        # One join/upper/encode for all names; NUL can't appear in a keyword
+        buf = np.frombuffer("\0".join(net_names).upper().encode('utf-8'), dtype=np.uint8)
+        return kernel(buf, len(net_names)).tolist()
+    
+    return [_is_power_net(name) for name in net_names]
+
+
+def _is_power_net(net_name: str) -> bool:
+    """Whether a net name looks like a power net"""
+    name = net_name.upper()
+    return (
+        name in _POWER_EXACT
+        or name.startswith(_POWER_PREFIX)
+        or any(keyword in name for keyword in _POWER_KEYWORDS)
+    )
+
+
+def _export_footprint(footprint) -> Dict[str, Any]:
+    """Component and pad data of one footprint, for export_netlist_info()"""
+    component_data = {
+        "reference": footprint.GetReference(),
+        "value": footprint.GetValue(),
+        "footprint": str(footprint.GetFPID().GetLibItemName()),
+        "layer": "Top" if not footprint.IsFlipped() else "Bottom",
+        "pads": []
+    }
+    
+    # Export pads
+    for pad in footprint.Pads():
+        size = pad.GetSize()
+        pad_data = {
+            "number": pad.GetNumber(),
+            "net": pad.GetNetname(),
+            "shape": str(pad.GetShape()),
+            "size": [size.x * _NM_TO_MM, size.y * _NM_TO_MM]
+        }
+        component_data["pads"].append(pad_data)
+    
+    return component_data
+
+
+def board_cache_key(board) -> Optional[tuple]:
+    """Build a context cache key for the board, or None if it can't be cached
+    
+    Shared by this parser and enhanced_parser so both invalidate on the same changes.
+    """
+    board_file = board.GetFileName()
+    if not board_file:
+        return None
+    try:
+        mtime = os.path.getmtime(board_file)
+    except OSError:
+        return None
+    
+    # The mtime only changes on save. Follow unsaved edits through the board's
+    # edit counter; without one, only cache a board with no unsaved changes
+    get_edit_stamp = getattr(board, "GetTimeStamp", None)
+    if get_edit_stamp is not None:
+        edit_stamp = get_edit_stamp()
+    elif hasattr(board, "IsModified") and not board.IsModified():
+        edit_stamp = None
+    else:
+        return None
+    return (id(board), board_file, mtime, edit_stamp)
+
+
+# Context depths accepted by parse_pcb_context(), from cheapest to most complete
+CONTEXT_DEPTHS = ("summary", "components", "full")
+
 
 class KiCadContextParser:
     """Parses KiCad design files to extract context for AI analysis"""
@@ -23,9 +218,22 @@ class KiCadContextParser:
     def __init__(self):
         self.current_board = None
         self.current_schematic = None
+        # Last (cache key, result) pairs, see board_cache_key()
+        self._ctx_cache: Dict[str, Tuple[tuple, str]] = {}  # keyed by depth
+        self._summary_cache: Tuple[Optional[tuple], Optional[str]] = (None, None)
+        # (raw design settings, formatted section) from the last analyze_design_rules()
+        self._drc_cache: Tuple[Optional[tuple], str] = (None, "")
+    
+    def bump_cache(self):
+        """Invalidate cached context (call after modifying the board)"""
+        self._ctx_cache.clear()
+        self._summary_cache = (None, None)
         
-    def get_current_context(self) -> str:
-        """Get context from the currently active KiCad editor"""
+    def get_current_context(self, depth: str = "full") -> str:
+        """Get context from the currently active KiCad editor
+        
+        depth is one of CONTEXT_DEPTHS; see parse_pcb_context().
+        """
         if not PCBNEW_AVAILABLE:
             return "KiCad modules not available for context parsing."
         
@@ -33,246 +241,303 @@ class KiCadContextParser:
             # Try to get the current board
             board = pcbnew.GetBoard()
             if board:
-                return self.parse_pcb_context(board)
+                key = board_cache_key(board)
+                cached = self._ctx_cache.get(depth)
+                if key is not None and cached is not None and cached[0] == key:
+                    return cached[1]
+                
+                context = self.parse_pcb_context(board, depth)
+                if key is not None:
+                    self._ctx_cache[depth] = (key, context)
+                return context
             else:
                 return "No active PCB design found."
         except Exception as e:
             return f"Error accessing KiCad context: {str(e)}"
     
-    def parse_pcb_context(self, board) -> str:
-        """Parse PCB board context"""
+    def get_components_context(self) -> str:
+        """Get only the component section for the active board"""
+        if not PCBNEW_AVAILABLE:
+            return "KiCad modules not available for context parsing."
+        
+        try:
+            board = pcbnew.GetBoard()
+            if not board:
+                return "No active PCB design found."
+            return self.analyze_components(board)
+        except Exception as e:
+            return f"Error accessing KiCad context: {str(e)}"
+    
+    def get_routing_context(self) -> str:
+        """Get only the routing sections (design rules, traces, vias) for the active board"""
+        if not PCBNEW_AVAILABLE:
+            return "KiCad modules not available for context parsing."
+        
+        try:
+            board = pcbnew.GetBoard()
+            if not board:
+                return "No active PCB design found."
+            return "\n\n".join(self._routing_parts(board))
+        except Exception as e:
+            return f"Error accessing KiCad context: {str(e)}"
+    
+    def parse_pcb_context(self, board, depth: str = "full") -> str:
+        """Parse PCB board context
+        
+        Depths (see CONTEXT_DEPTHS):
+          summary    - board header and component counts by type
+          components - adds the component details and net analysis
+          full       - adds design rules, traces and vias (walks every track)
+        """
         try:
-            context_parts = []
+            if depth not in CONTEXT_DEPTHS:
+                raise ValueError(f"Unknown context depth: {depth}")
+            
+            # Every line of the context, joined once at the end; sections are
+            # separated by an empty line
+            lines = []
             
             # Basic board info
-            context_parts.append("=== PCB DESIGN CONTEXT ===")
-            context_parts.append(f"Board file: {board.GetFileName()}")
+            lines.append("=== PCB DESIGN CONTEXT ===")
+            lines.append("")
+            lines.append(f"Board file: {board.GetFileName()}")
+            lines.append("")
             
             # Board dimensions
             bbox = board.GetBoardEdgesBoundingBox()
-            width_mm = pcbnew.ToMM(bbox.GetWidth())
-            height_mm = pcbnew.ToMM(bbox.GetHeight())
-            context_parts.append(f"Board size: {width_mm:.2f} x {height_mm:.2f} mm")
+            width_mm = bbox.GetWidth() * _NM_TO_MM
+            height_mm = bbox.GetHeight() * _NM_TO_MM
+            lines.append(f"Board size: {width_mm:.2f} x {height_mm:.2f} mm")
+            lines.append("")
             
             # Layer count
             layer_count = board.GetCopperLayerCount()
-            context_parts.append(f"Layer count: {layer_count}")
+            lines.append(f"Layer count: {layer_count}")
+            lines.append("")
+            
+            if depth == "summary":
+                self._emit_components(board, lines, detail_limit=0)
+                return "\n".join(lines)
             
             # Components analysis
-            components_info = self.analyze_components(board)
-            context_parts.append(components_info)
+            self._emit_components(board, lines)
+            lines.append("")
             
             # Nets analysis
-            nets_info = self.analyze_nets(board)
-            context_parts.append(nets_info)
+            self._emit_nets(board, lines)
             
-            # Design rules and constraints
-            drc_info = self.analyze_design_rules(board)
-            if drc_info:
-                context_parts.append(drc_info)
+            if depth == "full":
+                for part in self._routing_parts(board):
+                    lines.append("")
+                    lines.append(part)
             
-            # Trace analysis
-            traces_info = self.analyze_traces(board)
-            context_parts.append(traces_info)
-            
-            # Via analysis
-            vias_info = self.analyze_vias(board)
-            context_parts.append(vias_info)
-            
-            return "\n\n".join(context_parts)
+            return "\n".join(lines)
             
         except Exception as e:
             return f"Error parsing PCB context: {str(e)}"
     
-    def analyze_components(self, board) -> str:
-        """Analyze components on the board"""
+    def _routing_parts(self, board) -> List[str]:
+        """Design rule, trace and via sections of the context"""
+        parts = []
+        
+        # Design rules and constraints
+        drc_info = self.analyze_design_rules(board)
+        if drc_info:
+            parts.append(drc_info)
+        
+        # Trace and via analysis (one pass over the tracks)
+        traces_info, vias_info = self._analyze_tracks_and_vias(board)
+        parts.append(traces_info)
+        parts.append(vias_info)
+        
+        return parts
+    
+    def summarize_components(self, board) -> str:
+        """Count components by reference prefix, without per-component details"""
+        return self.analyze_components(board, detail_limit=0)
+    
+    def analyze_components(self, board, detail_limit: int = 20) -> str:
+        """Analyze components on the board
+        
+        Lists details for the first detail_limit components; 0 gives counts only.
+        """
+        lines = []
+        self._emit_components(board, lines, detail_limit)
+        return "\n".join(lines)
+    
+    def analyze_nets(self, board) -> str:
+        """Analyze nets and connectivity"""
+        lines = []
+        self._emit_nets(board, lines)
+        return "\n".join(lines)
+    
+    # The _emit_* methods append a section's lines to a shared list so that
+    # parse_pcb_context() joins the whole context once. On error the partial
+    # section is dropped and replaced by the error line.
+    
+    def _emit_components(self, board, out: List[str], detail_limit: int = 20):
+        start = len(out)
         try:
-            components = []
+            if detail_limit <= 0:
+                # Counts only - no per-footprint calls beyond the reference
+                component_types = Counter(_ref_prefix(footprint.GetReference()) for footprint in board.GetFootprints())
+                out.append(f"=== COMPONENTS ({sum(component_types.values())} total) ===")
+                for comp_type, count in component_types.items():
+                    out.append(f"{comp_type}: {count} components")
+                return
+            
+            component_types = Counter()
+            detail_rows = []
             component_count = 0
             
             for footprint in board.GetFootprints():
                 component_count += 1
-                
-                # Get component info
                 reference = footprint.GetReference()
-                value = footprint.GetValue()
-                footprint_name = str(footprint.GetFPID().GetLibItemName())
-                
-                # Position
-                pos = footprint.GetPosition()
-                x_mm = pcbnew.ToMM(pos.x)
-                y_mm = pcbnew.ToMM(pos.y)
+                component_types[_ref_prefix(reference)] += 1
                 
-                # Layer (Top/Bottom)
-                layer = "Top" if footprint.IsFlipped() == False else "Bottom"
-                
-                # Rotation
-                rotation = footprint.GetOrientation() / 10.0  # Convert to degrees
-                
-                components.append({
-                    'reference': reference,
-                    'value': value,
-                    'footprint': footprint_name,
-                    'position': (x_mm, y_mm),
-                    'layer': layer,
-                    'rotation': rotation
-                })
+                # Only the first few components get a detail row
+                if len(detail_rows) < detail_limit:
+                    pos = footprint.GetPosition()
+                    layer = "Top" if not footprint.IsFlipped() else "Bottom"
+                    detail_rows.append(
+                        f"  {reference}: {footprint.GetValue()} "
+                        f"({footprint.GetFPID().GetLibItemName()}) "
+                        f"at ({pos.x * _NM_TO_MM:.1f}, {pos.y * _NM_TO_MM:.1f}) "
+                        f"on {layer} layer"
+                    )
             
             # Create summary
-            result = [f"=== COMPONENTS ({component_count} total) ==="]
-            
-            # Group by component type
-            component_types = {}
-            for comp in components:
-                ref_prefix = ''.join(filter(str.isalpha, comp['reference']))
-                if ref_prefix not in component_types:
-                    component_types[ref_prefix] = []
-                component_types[ref_prefix].append(comp)
+            out.append(f"=== COMPONENTS ({component_count} total) ===")
             
             # Summary by type
-            for comp_type, comps in component_types.items():
-                result.append(f"{comp_type}: {len(comps)} components")
+            for comp_type, count in component_types.items():
+                out.append(f"{comp_type}: {count} components")
             
             # Detailed component list (limit to avoid overwhelming)
-            result.append("\nComponent Details:")
-            for comp in components[:20]:  # Limit to first 20
-                result.append(
-                    f"  {comp['reference']}: {comp['value']} "
-                    f"({comp['footprint']}) at ({comp['position'][0]:.1f}, {comp['position'][1]:.1f}) "
-                    f"on {comp['layer']} layer"
-                )
-            
-            if len(components) > 20:
-                result.append(f"  ... and {len(components) - 20} more components")
+            out.append("\nComponent Details:")
+            out.extend(detail_rows)
             
-            return "\n".join(result)
+            if component_count > detail_limit:
+                out.append(f"  ... and {component_count - detail_limit} more components")
             
         except Exception as e:
-            return f"Error analyzing components: {str(e)}"
+            del out[start:]
+            out.append(f"Error analyzing components: {str(e)}")
     
-    def analyze_nets(self, board) -> str:
-        """Analyze nets and connectivity"""
+    def _emit_nets(self, board, out: List[str]):
+        start = len(out)
         try:
             netlist = board.GetNetInfo()
             net_count = netlist.GetNetCount()
             
-            result = [f"=== NETS ({net_count} total) ==="]
+            out.append(f"=== NETS ({net_count} total) ===")
             
             # Analyze significant nets
             power_nets = []
             signal_nets = []
             
+            net_names = []
             for net_code in range(net_count):
                 net = netlist.GetNetItem(net_code)
                 if net:
-                    net_name = net.GetNetname()
-                    
-                    # Categorize nets
-                    if any(power_keyword in net_name.upper() for power_keyword in 
-                           ['VCC', 'VDD', 'VEE', 'VSS', 'GND', 'POWER', '+5V', '+3V3', '+12V', '-12V']):
-                        power_nets.append(net_name)
-                    elif net_name and net_name != "":
-                        signal_nets.append(net_name)
-            
-            result.append(f"Power nets ({len(power_nets)}): {', '.join(power_nets[:10])}")
-            if len(power_nets) > 10:
-                result.append(f"  ... and {len(power_nets) - 10} more power nets")
+                    net_names.append(net.GetNetname())
             
-            result.append(f"Signal nets: {len(signal_nets)} total")
+            # Categorize nets
+            for net_name, is_power in zip(net_names, _power_net_mask(net_names)):
+                if is_power:
+                    power_nets.append(net_name)
+                elif net_name:
+                    signal_nets.append(net_name)
             
-            return "\n".join(result)
+            out.append(f"Power nets ({len(power_nets)}): {', '.join(power_nets[:10])}")
+            if len(power_nets) > 10:
+                out.append(f"  ... and {len(power_nets) - 10} more power nets")
+            
+            out.append(f"Signal nets: {len(signal_nets)} total")
             
         except Exception as e:
-            return f"Error analyzing nets: {str(e)}"
+            del out[start:]
+            out.append(f"Error analyzing nets: {str(e)}")
     
     def analyze_design_rules(self, board) -> str:
         """Analyze design rules and potential DRC violations"""
         try:
             # This is a simplified version - full DRC would require running the DRC engine
-            result = ["=== DESIGN RULES ==="]
-            
-            # Get design settings
             design_settings = board.GetDesignSettings()
             
-            # Track widths
-            track_width = pcbnew.ToMM(design_settings.GetCurrentTrackWidth())
-            result.append(f"Current track width: {track_width:.3f} mm")
+            # Raw settings (nm); reuse the formatted section if none of them changed
+            fingerprint = (
+                design_settings.GetCurrentTrackWidth(),
+                design_settings.GetCurrentViaSize(),
+                design_settings.GetCurrentViaDrill(),
+                design_settings.m_TrackMinWidth,
+                design_settings.m_ViasMinSize,
+            )
+            if self._drc_cache[0] == fingerprint:
+                return self._drc_cache[1]
             
-            # Via sizes
-            via_size = pcbnew.ToMM(design_settings.GetCurrentViaSize())
-            via_drill = pcbnew.ToMM(design_settings.GetCurrentViaDrill())
-            result.append(f"Current via: {via_size:.3f} mm (drill: {via_drill:.3f} mm)")
+            track_width, via_size, via_drill, min_track_width, min_via_size = (
+                value * _NM_TO_MM for value in fingerprint
+            )
             
-            # Minimum values
-            min_track_width = pcbnew.ToMM(design_settings.m_TrackMinWidth)
-            min_via_size = pcbnew.ToMM(design_settings.m_ViasMinSize)
+            result = ["=== DESIGN RULES ==="]
+            result.append(f"Current track width: {track_width:.3f} mm")
+            result.append(f"Current via: {via_size:.3f} mm (drill: {via_drill:.3f} mm)")
             result.append(f"Minimums - Track: {min_track_width:.3f} mm, Via: {min_via_size:.3f} mm")
             
-            return "\n".join(result)
+            text = "\n".join(result)
+            self._drc_cache = (fingerprint, text)
+            return text
             
         except Exception as e:
             return f"Error analyzing design rules: {str(e)}"
     
-    def analyze_traces(self, board) -> str:
-        """Analyze PCB traces"""
+    def _analyze_tracks_and_vias(self, board) -> Tuple[str, str]:
+        """Analyze PCB traces and vias in a single pass over board.GetTracks()"""
         try:
-            tracks = board.GetTracks()
-            
-            total_tracks = 0
-            total_length = 0
-            width_stats = {}
-            
-            for track in tracks:
-                if track.GetClass() == "PCB_TRACK":
-                    total_tracks += 1
-                    total_length += pcbnew.ToMM(track.GetLength())
-                    
-                    width = pcbnew.ToMM(track.GetWidth())
-                    width_key = f"{width:.3f}"
-                    width_stats[width_key] = width_stats.get(width_key, 0) + 1
-            
-            result = [f"=== TRACES ({total_tracks} total) ==="]
-            result.append(f"Total trace length: {total_length:.1f} mm")
-            
-            # Width distribution
-            result.append("Track width distribution:")
-            for width, count in sorted(width_stats.items())[:5]:
-                result.append(f"  {width} mm: {count} tracks")
-            
-            return "\n".join(result)
-            
-        except Exception as e:
-            return f"Error analyzing traces: {str(e)}"
-    
-    def analyze_vias(self, board) -> str:
-        """Analyze vias on the board"""
-        try:
-            tracks = board.GetTracks()
+            # Raw nm values, reduced after the loop by _track_stats()
+            widths = array('q')
+            lengths = array('q')
             
             via_count = 0
-            via_sizes = {}
+            via_sizes = Counter()
             
-            for track in tracks:
-                if track.GetClass() == "PCB_VIA":
+            for track in board.GetTracks():
+                track_class = track.GetClass()
+                if track_class == "PCB_TRACK":
+                    widths.append(track.GetWidth())
+                    lengths.append(int(track.GetLength()))
+                
+                elif track_class == "PCB_VIA":
                     via_count += 1
                     
-                    size = pcbnew.ToMM(track.GetWidth())
-                    drill = pcbnew.ToMM(track.GetDrillValue())
+                    size = track.GetWidth() * _NM_TO_MM
+                    drill = track.GetDrillValue() * _NM_TO_MM
                     
                     size_key = f"{size:.3f}/{drill:.3f}"
-                    via_sizes[size_key] = via_sizes.get(size_key, 0) + 1
+                    via_sizes[size_key] += 1
+            
+            total_length, top_widths = _track_stats(widths, lengths)
+            
+            traces = [f"=== TRACES ({len(widths)} total) ==="]
+            traces.append(f"Total trace length: {total_length:.1f} mm")
+            
+            # Width distribution (most common first)
+            traces.append("Track width distribution:")
+            for width, count in top_widths:
+                traces.append(f"  {width:.3f} mm: {count} tracks")
             
-            result = [f"=== VIAS ({via_count} total) ==="]
+            vias = [f"=== VIAS ({via_count} total) ==="]
             
             # Via size distribution
-            result.append("Via sizes (outer/drill):")
+            vias.append("Via sizes (outer/drill):")
             for size, count in via_sizes.items():
-                result.append(f"  {size} mm: {count} vias")
+                vias.append(f"  {size} mm: {count} vias")
             
-            return "\n".join(result)
+            return "\n".join(traces), "\n".join(vias)
             
         except Exception as e:
-            return f"Error analyzing vias: {str(e)}"
+            return f"Error analyzing traces: {str(e)}", f"Error analyzing vias: {str(e)}"
     
     def parse_schematic_context(self, schematic_file: str) -> str:
         """Parse schematic file context (placeholder for future implementation)"""
@@ -280,8 +545,12 @@ class KiCadContextParser:
         # For now, return a placeholder
         return f"Schematic analysis not yet implemented for {schematic_file}"
     
-    def get_project_files(self) -> Dict[str, List[str]]:
-        """Get list of project files"""
+    def get_project_files(self, include_other: bool = True) -> Dict[str, List[str]]:
+        """Get list of project files
+        
+        Other files named after the project are listed under "other" unless
+        include_other is False, in which case only known suffixes are classified.
+        """
         try:
             if not PCBNEW_AVAILABLE:
                 return {"error": ["PCBNew not available"]}
@@ -305,22 +574,18 @@ class KiCadContextParser:
                 "other": []
             }
             
-            # Look for related files
-            for file_path in project_dir.iterdir():
-                if file_path.is_file():
-                    suffix = file_path.suffix.lower()
-                    name = file_path.name
+            # Look for related files in one directory pass; the suffix lookup comes
+            # first so unrelated build artifacts are dropped without a type check
+            with os.scandir(project_dir) as entries:
+                for entry in entries:
+                    category = _SUFFIX_MAP.get(os.path.splitext(entry.name)[1].lower())
+                    if category is None:
+                        if not include_other or project_name not in entry.name:
+                            continue
+                        category = "other"
                     
-                    if suffix == '.kicad_pcb':
-                        files["pcb"].append(str(file_path))
-                    elif suffix == '.kicad_sch':
-                        files["schematic"].append(str(file_path))
-                    elif suffix in ['.kicad_sym', '.lib']:
-                        files["libraries"].append(str(file_path))
-                    elif suffix in ['.gbr', '.drl', '.gko', '.gts', '.gbs']:
-                        files["gerbers"].append(str(file_path))
-                    elif project_name in name:
-                        files["other"].append(str(file_path))
+                    if entry.is_file():
+                        files[category].append(entry.path)
             
             return files
             
@@ -337,18 +602,27 @@ class KiCadContextParser:
             if not board:
                 return "No active PCB design"
             
+            key = board_cache_key(board)
+            if key is not None and self._summary_cache[0] == key:
+                return self._summary_cache[1]
+            
             # Quick summary
-            footprint_count = len(list(board.GetFootprints()))
+            # FOOTPRINTS is a SWIG std::deque; size() avoids wrapping every footprint
+            footprints = board.GetFootprints()
+            footprint_count = footprints.size() if hasattr(footprints, 'size') else sum(1 for _ in footprints)
             net_count = board.GetNetInfo().GetNetCount()
             
             bbox = board.GetBoardEdgesBoundingBox()
-            width_mm = pcbnew.ToMM(bbox.GetWidth())
-            height_mm = pcbnew.ToMM(bbox.GetHeight())
+            width_mm = bbox.GetWidth() * _NM_TO_MM
+            height_mm = bbox.GetHeight() * _NM_TO_MM
             
-            return (
+            summary = (
                 f"Active PCB: {footprint_count} components, {net_count} nets, "
                 f"{width_mm:.1f}x{height_mm:.1f}mm, {board.GetCopperLayerCount()} layers"
             )
+            if key is not None:
+                self._summary_cache = (key, summary)
+            return summary
             
         except Exception as e:
             return f"Error getting context summary: {str(e)}"
@@ -369,27 +643,14 @@ class KiCadContextParser:
                 "connections": []
             }
             
-            # Export components
-            for footprint in board.GetFootprints():
-                component_data = {
-                    "reference": footprint.GetReference(),
-                    "value": footprint.GetValue(),
-                    "footprint": str(footprint.GetFPID().GetLibItemName()),
-                    "layer": "Top" if not footprint.IsFlipped() else "Bottom",
-                    "pads": []
-                }
-                
-                # Export pads
-                for pad in footprint.Pads():
-                    pad_data = {
-                        "number": pad.GetNumber(),
-                        "net": pad.GetNetname(),
-                        "shape": str(pad.GetShape()),
-                        "size": [pcbnew.ToMM(pad.GetSize().x), pcbnew.ToMM(pad.GetSize().y)]
-                    }
-                    component_data["pads"].append(pad_data)
-                
-                netlist_data["components"].append(component_data)
+            # Export components - iterate the board serially, footprints are independent after that
+            footprints = list(board.GetFootprints())
+            if len(footprints) >= _EXPORT_PARALLEL_MIN:
+                workers = min(_EXPORT_MAX_WORKERS, os.cpu_count() or 1)
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    netlist_data["components"] = list(executor.map(_export_footprint, footprints))
+            else:
+                netlist_data["components"] = [_export_footprint(footprint) for footprint in footprints]
             
             # Export nets
             netinfo = board.GetNetInfo()
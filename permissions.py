@@ -3,9 +3,31 @@ Permission System for Design Modifications
 Handles user consent and safety for write operations
 """
 
+import json
+import os
 from typing import Dict, List, Callable, Optional
 from enum import Enum
 
+from .config import config
+
+
+# Append-only JSON Lines record of every modification, kept next to config.json
+MODIFICATION_LOG_NAME = "modification_log.jsonl"
+
+
+# Appended to responses that suggest design changes; it doesn't vary with permission state
+SAFETY_SUMMARY = """
+🛡️ **Safety Features Active**
+
+- **Permission Required**: All changes require your approval
+- **Undo Available**: All modifications can be reversed
+- **Change History**: Full log of all modifications
+- **Backup Recommended**: Save your design before major changes
+- **Risk Assessment**: Each change is classified by risk level
+
+You maintain full control over your design at all times.
+"""
+
 
 class PermissionLevel(Enum):
     """Permission levels for design modifications"""
@@ -27,6 +49,71 @@ class ModificationRisk(Enum):
 class PermissionManager:
     """Manages permissions for design modifications"""
     
+    # Risk level per modification type
+    _RISK_TABLE = {
+        # Advanced operations (settings, layers) are high/critical risk
+        "add_copper_layers": ModificationRisk.CRITICAL,
+        "change_layer_count": ModificationRisk.CRITICAL,
+        "modify_stackup": ModificationRisk.CRITICAL,
+        "modify_board_settings": ModificationRisk.HIGH,
+        "change_track_width": ModificationRisk.HIGH,
+        "change_via_size": ModificationRisk.HIGH,
+        
+        # Component operations
+        "move_component": ModificationRisk.MEDIUM,
+        "rotate_component": ModificationRisk.MEDIUM,
+        "delete_component": ModificationRisk.HIGH,
+        "add_component": ModificationRisk.HIGH,
+        "change_component_value": ModificationRisk.HIGH,
+        
+        # Net and routing operations
+        "reroute_net": ModificationRisk.MEDIUM,
+        "add_track": ModificationRisk.MEDIUM,
+        "delete_net": ModificationRisk.CRITICAL,
+        "split_net": ModificationRisk.CRITICAL,
+        "merge_nets": ModificationRisk.CRITICAL,
+        
+        # Cosmetic changes
+        "update_silkscreen": ModificationRisk.SAFE,
+        "modify_text": ModificationRisk.SAFE,
+        "change_color": ModificationRisk.SAFE,
+    }
+    
+    _ADVANCED_WARNINGS = {
+        "add_copper_layers": (
+            "⚠️ Adding copper layers will affect manufacturing cost",
+            "⚠️ Existing routing may need to be updated",
+            "⚠️ Layer stackup should be verified with PCB manufacturer",
+            "⚠️ This change cannot be easily undone"
+        ),
+        "modify_board_settings": (
+            "⚠️ Changing track/via sizes may affect existing routing",
+            "⚠️ New settings must meet manufacturing constraints",
+            "⚠️ DRC violations may be introduced"
+        ),
+        "change_stackup": (
+            "⚠️ Stackup changes affect impedance calculations",
+            "⚠️ Manufacturing cost and timeline may be affected",
+            "⚠️ Signal integrity analysis should be repeated"
+        ),
+    }
+    
+    _RISK_COLORS = {
+        ModificationRisk.SAFE: "🟢",
+        ModificationRisk.LOW: "🟡", 
+        ModificationRisk.MEDIUM: "🟠",
+        ModificationRisk.HIGH: "🔴",
+        ModificationRisk.CRITICAL: "⚠️"
+    }
+    
+    _RISK_DESCRIPTIONS = {
+        ModificationRisk.SAFE: "Safe (cosmetic changes only)",
+        ModificationRisk.LOW: "Low risk (minor modifications)",
+        ModificationRisk.MEDIUM: "Medium risk (component/routing changes)",
+        ModificationRisk.HIGH: "High risk (significant design changes)",
+        ModificationRisk.CRITICAL: "Critical (netlist/structural changes)"
+    }
+    
     def __init__(self):
         self.permission_level = PermissionLevel.ASK_PERMISSION
         self.user_preferences = {
@@ -40,32 +127,8 @@ class PermissionManager:
     
     def assess_modification_risk(self, modification_type: str, details: Dict[str, any] = None) -> ModificationRisk:
         """Assess the risk level of a proposed modification"""
-        
-        # Advanced operations (settings, layers) are high/critical risk
-        if modification_type in ["add_copper_layers", "change_layer_count", "modify_stackup"]:
-            return ModificationRisk.CRITICAL
-        elif modification_type in ["modify_board_settings", "change_track_width", "change_via_size"]:
-            return ModificationRisk.HIGH
-        
-        # Component operations
-        elif modification_type in ["move_component", "rotate_component"]:
-            return ModificationRisk.MEDIUM
-        elif modification_type in ["delete_component", "add_component", "change_component_value"]:
-            return ModificationRisk.HIGH
-        
-        # Net and routing operations
-        elif modification_type in ["reroute_net", "add_track"]:
-            return ModificationRisk.MEDIUM
-        elif modification_type in ["delete_net", "split_net", "merge_nets"]:
-            return ModificationRisk.CRITICAL
-        
-        # Cosmetic changes
-        elif modification_type in ["update_silkscreen", "modify_text", "change_color"]:
-            return ModificationRisk.SAFE
-        
         # Default to medium risk for unknown operations
-        else:
-            return ModificationRisk.MEDIUM
+        return self._RISK_TABLE.get(modification_type, ModificationRisk.MEDIUM)
     
     def can_perform_advanced_operations(self) -> bool:
         """Check if advanced operations can be performed"""
@@ -79,31 +142,7 @@ class PermissionManager:
     
     def get_advanced_operation_warnings(self, operation_type: str) -> List[str]:
         """Get specific warnings for advanced operations"""
-        warnings = []
-        
-        if operation_type == "add_copper_layers":
-            warnings.extend([
-                "⚠️ Adding copper layers will affect manufacturing cost",
-                "⚠️ Existing routing may need to be updated",
-                "⚠️ Layer stackup should be verified with PCB manufacturer",
-                "⚠️ This change cannot be easily undone"
-            ])
-        
-        elif operation_type == "modify_board_settings":
-            warnings.extend([
-                "⚠️ Changing track/via sizes may affect existing routing",
-                "⚠️ New settings must meet manufacturing constraints",
-                "⚠️ DRC violations may be introduced"
-            ])
-        
-        elif operation_type == "change_stackup":
-            warnings.extend([
-                "⚠️ Stackup changes affect impedance calculations",
-                "⚠️ Manufacturing cost and timeline may be affected",
-                "⚠️ Signal integrity analysis should be repeated"
-            ])
-        
-        return warnings
+        return list(self._ADVANCED_WARNINGS.get(operation_type, ()))
     
     def request_permission(self, description: str, risk: ModificationRisk, 
                           details: str = "") -> Dict[str, any]:
@@ -152,28 +191,12 @@ class PermissionManager:
     def get_permission_prompt(self, description: str, risk: ModificationRisk, details: str = "") -> str:
         """Generate a user-friendly permission prompt"""
         
-        risk_colors = {
-            ModificationRisk.SAFE: "🟢",
-            ModificationRisk.LOW: "🟡", 
-            ModificationRisk.MEDIUM: "🟠",
-            ModificationRisk.HIGH: "🔴",
-            ModificationRisk.CRITICAL: "⚠️"
-        }
-        
-        risk_descriptions = {
-            ModificationRisk.SAFE: "Safe (cosmetic changes only)",
-            ModificationRisk.LOW: "Low risk (minor modifications)",
-            ModificationRisk.MEDIUM: "Medium risk (component/routing changes)",
-            ModificationRisk.HIGH: "High risk (significant design changes)",
-            ModificationRisk.CRITICAL: "Critical (netlist/structural changes)"
-        }
-        
         prompt = f"""
 🤖 **KiCat AI Permission Request**
 
 **Proposed Change:** {description}
 
-**Risk Level:** {risk_colors[risk]} {risk_descriptions[risk]}
+**Risk Level:** {self._RISK_COLORS[risk]} {self._RISK_DESCRIPTIONS[risk]}
 
 **Details:** {details if details else "No additional details provided"}
 
@@ -188,24 +211,45 @@ Would you like me to proceed with this modification?
     
     def generate_safety_summary(self) -> str:
         """Generate a summary of safety measures"""
-        return """
-🛡️ **Safety Features Active**
-
-- **Permission Required**: All changes require your approval
-- **Undo Available**: All modifications can be reversed
-- **Change History**: Full log of all modifications
-- **Backup Recommended**: Save your design before major changes
-- **Risk Assessment**: Each change is classified by risk level
-
-You maintain full control over your design at all times.
-"""
+        return SAFETY_SUMMARY
 
 
 class ModificationLogger:
     """Logs all design modifications for audit trail"""
     
-    def __init__(self):
+    def __init__(self, log_path: Optional[str] = None):
         self.log_entries = []
+        self._fh = None
+        self._path = None
+        if log_path is not None:
+            self.attach_file(log_path)
+    
+    def attach_file(self, file_path: str) -> bool:
+        """Append log entries to a JSON Lines file as they are logged"""
+        try:
+            # Line buffered, so every entry is on disk even if KiCad crashes
+            fh = open(file_path, 'a', buffering=1, encoding='utf-8')
+        except OSError:
+            return False
+        
+        self.close()
+        self._fh = fh
+        self._path = os.path.abspath(file_path)
+        
+        # Entries logged before attaching still belong in the file
+        for entry in self.log_entries:
+            self._fh.write(json.dumps(entry) + "\n")
+        return True
+    
+    def close(self):
+        """Detach the log file, if any"""
+        if self._fh is not None:
+            try:
+                self._fh.close()
+            except OSError:
+                pass
+            self._fh = None
+            self._path = None
     
     def log_modification(self, description: str, risk: ModificationRisk, 
                         approved: bool, user_id: str = "user"):
@@ -221,6 +265,12 @@ class ModificationLogger:
         }
         
         self.log_entries.append(entry)
+        
+        if self._fh is not None:
+            try:
+                self._fh.write(json.dumps(entry) + "\n")
+            except OSError:
+                self.close()
     
     def get_session_summary(self) -> str:
         """Get summary of current session modifications"""
@@ -241,11 +291,14 @@ class ModificationLogger:
         return summary
     
     def export_log(self, file_path: str) -> bool:
-        """Export modification log to file"""
+        """Export this session's modification log to a JSON Lines file"""
         try:
-            import json
-            with open(file_path, 'w') as f:
-                json.dump(self.log_entries, f, indent=2)
+            # The attached file already holds every entry, earlier sessions included
+            if self._fh is not None and os.path.abspath(file_path) == self._path:
+                return True
+            
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.writelines(json.dumps(entry) + "\n" for entry in self.log_entries)
             return True
         except Exception:
             return False
@@ -253,4 +306,4 @@ class ModificationLogger:
 
 # Global instances
 permission_manager = PermissionManager()
-modification_logger = ModificationLogger()
+modification_logger = ModificationLogger(os.path.join(config.config_dir, MODIFICATION_LOG_NAME))
@@ -3,43 +3,286 @@ Installation and Setup Script for Smart Cat AI Assistant
 Supports local installation and installation from GitHub repository
 """
 
+import compileall
+import hashlib
+import importlib.util
 import os
 import sys
 import platform
+import re
 import shutil
 import subprocess
+import tarfile
 import tempfile
-import zipfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from urllib.request import urlretrieve
+from urllib.request import Request, urlopen
 
 
+# Plugin files copied on install
+ESSENTIAL_FILES = [
+    "__init__.py", "main.py", "ui.py", "AI_API.py", "config.py",
+    "enhanced_parser.py", "kicad_operations.py", "circuit_generator.py",
+    "permissions.py", "parser.py"
+]
+
+
+def _tree_copy_jobs(src, dst):
+    """Create dst's directory tree mirroring src and list the (source, dest) file copies"""
+    jobs = []
+    for root, _, files in os.walk(src):
+        target = dst / Path(root).relative_to(src)
+        target.mkdir(parents=True, exist_ok=True)
+        jobs.extend((Path(root, name), target / name) for name in files)
+    return jobs
+
+
+def copy_plugin_files(source_dir, dest_dir):
+    """Copy the essential files and resources/ into dest_dir
+    
+    All files, including the resources/ tree, are copied concurrently with
+    shutil.copyfile (no metadata copy, and a kernel-side copy where the OS
+    supports it). Returns (copied, missing).
+    """
+    # One directory listing instead of a stat per expected file
+    with os.scandir(source_dir) as entries:
+        present = {entry.name: entry.is_dir() for entry in entries}
+    
+    jobs = [(source_dir / name, dest_dir / name) for name in ESSENTIAL_FILES if present.get(name) is False]
+    missing = [name for name in ESSENTIAL_FILES if name not in present]
+    copied = [dest.name for _, dest in jobs]
+    
+    # Copy resources folder if it exists
+    if present.get("resources"):
+        jobs.extend(_tree_copy_jobs(source_dir / "resources", dest_dir / "resources"))
+        copied.append("resources/")
+    
+    if jobs:
+        with ThreadPoolExecutor(max_workers=min(8, len(jobs))) as executor:
+            list(executor.map(lambda job: shutil.copyfile(*job), jobs))
+    
+    return copied, missing
+
+
+def prepare_staging(dest_dir):
+    """Create an empty staging directory next to dest_dir to build a new install in"""
+    dest_dir.parent.mkdir(parents=True, exist_ok=True)
+    staging_dir = dest_dir.parent / (dest_dir.name + ".new")
+    if staging_dir.exists():
+        shutil.rmtree(staging_dir)
+    staging_dir.mkdir()
+    return staging_dir
+
+
+def precompile_plugin(staging_dir):
+    """Byte-compile the staged plugin so KiCad's first load skips compilation
+    
+    Also catches syntax errors before the install goes live. Returns False on failure.
+    Runs in-process: workers=0 spawns a process pool, which fails when setup.py is
+    run from an embedded interpreter such as KiCad's scripting console.
+    """
+    return bool(compileall.compile_dir(str(staging_dir), quiet=1, workers=1))
+
+
+def swap_into_place(staging_dir, dest_dir):
+    """Replace dest_dir with the finished staging directory using renames
+    
+    The previous install is deleted on a background thread. The thread is not a
+    daemon so the interpreter finishes the deletion before exiting; a leftover
+    ".old" directory would otherwise sit in KiCad's plugin folder.
+    """
+    old_dir = dest_dir.parent / (dest_dir.name + ".old")
+    if old_dir.exists():
+        shutil.rmtree(old_dir, ignore_errors=True)
+    
+    if dest_dir.exists():
+        try:
+            os.replace(dest_dir, old_dir)
+        except OSError:
+            # Windows refuses to rename a directory with open handles
+            print("Removing existing installation...")
+            shutil.rmtree(dest_dir)
+    
+    os.replace(staging_dir, dest_dir)
+    
+    if old_dir.exists():
+        threading.Thread(target=shutil.rmtree, args=(old_dir,), kwargs={"ignore_errors": True}).start()
+
+
+# Written into the installed plugin; records what the install was copied from
+MANIFEST_NAME = ".install_manifest"
+
+
+def _install_manifest(source_dir):
+    """Hash of the names, sizes and mtimes of everything copy_plugin_files() would copy"""
+    digest = hashlib.sha256()
+    
+    def add(rel_path, stat_result):
+        digest.update(f"{rel_path}\0{stat_result.st_size}\0{stat_result.st_mtime_ns}\n".encode("utf-8"))
+    
+    for file_name in sorted(ESSENTIAL_FILES):
+        try:
+            add(file_name, os.stat(source_dir / file_name))
+        except OSError:
+            digest.update(f"{file_name}\0missing\n".encode("utf-8"))
+    
+    # Walk resources/ with scandir so file sizes/mtimes come from one stat per entry
+    pending = ["resources"]
+    while pending:
+        rel_dir = pending.pop()
+        try:
+            entries = sorted(os.scandir(source_dir / rel_dir), key=lambda entry: entry.name)
+        except OSError:
+            continue
+        for entry in entries:
+            rel_path = f"{rel_dir}/{entry.name}"
+            if entry.is_dir():
+                pending.append(rel_path)
+            else:
+                add(rel_path, entry.stat())
+    
+    return digest.hexdigest()
+
+
+def _version_key(name):
+    """Numeric sort key for a KiCad version directory name ("9.0" -> (9, 0)), or None"""
+    parts = name.split(".")
+    if not all(part.isdigit() for part in parts):
+        return None
+    return tuple(int(part) for part in parts)
+
+
+@lru_cache(maxsize=1)
 def get_kicad_plugin_directory():
-    """Get the KiCad plugins directory for the current OS"""
+    """Get the KiCad plugins directory for the current OS
+    
+    Picks the newest installed KiCad version. Where both exist for a version, the
+    3rd-party (PCM) plugins directory is preferred over scripting/plugins.
+    """
     system = platform.system()
+    home = Path.home()
     
     if system == "Windows":
-        # Check for KiCad 9.0+ first (newer location)
-        kicad9_dir = Path.home() / "Documents" / "KiCad" / "9.0" / "3rdparty" / "plugins"
-        if kicad9_dir.exists():
-            return kicad9_dir
-        
-        # Check for KiCad 8.0 (Documents location)
-        kicad8_dir = Path.home() / "Documents" / "KiCad" / "8.0" / "3rdparty" / "plugins"
-        if kicad8_dir.exists():
-            return kicad8_dir
-            
-        # Fallback to KiCad 7.0 (AppData location)
-        appdata = os.environ.get("APPDATA", "")
-        return Path(appdata) / "kicad" / "7.0" / "scripting" / "plugins"
-    
+        # KiCad 8.0+ uses Documents, older versions use AppData
+        scripting_root = Path(os.environ.get("APPDATA", "")) / "kicad"
+        roots = [
+            (home / "Documents" / "KiCad", ("3rdparty", "plugins")),
+            (scripting_root, ("scripting", "plugins")),
+        ]
     elif system == "Darwin":  # macOS
-        # macOS: ~/Library/Application Support/kicad/7.0/scripting/plugins/
-        return Path.home() / "Library" / "Application Support" / "kicad" / "7.0" / "scripting" / "plugins"
-    
+        # macOS: ~/Library/Application Support/kicad/<version>/scripting/plugins/
+        scripting_root = home / "Library" / "Application Support" / "kicad"
+        roots = [
+            (home / "Documents" / "KiCad", ("3rdparty", "plugins")),
+            (scripting_root, ("scripting", "plugins")),
+        ]
     else:  # Linux and others
-        # Linux: ~/.local/share/kicad/7.0/scripting/plugins/
-        return Path.home() / ".local" / "share" / "kicad" / "7.0" / "scripting" / "plugins"
+        # Linux: ~/.local/share/kicad/<version>/scripting/plugins/
+        scripting_root = home / ".local" / "share" / "kicad"
+        roots = [
+            (scripting_root, ("3rdparty", "plugins")),
+            (scripting_root, ("scripting", "plugins")),
+        ]
+    
+    best = None
+    for root, subdirs in roots:
+        try:
+            entries = list(os.scandir(root))
+        except OSError:
+            continue
+        
+        for entry in entries:
+            version = _version_key(entry.name)
+            if version is None or (best is not None and version <= best[0]):
+                continue
+            plugins_dir = Path(entry.path, *subdirs)
+            if plugins_dir.is_dir():
+                best = (version, plugins_dir)
+    
+    if best is not None:
+        return best[1]
+    
+    # Nothing installed yet - fall back to the KiCad 7.0 location
+    return scripting_root / "7.0" / "scripting" / "plugins"
+
+
+def get_plugin_install_directory():
+    """Get the directory the plugin is installed to (and uninstalled from)"""
+    plugins_dir = get_kicad_plugin_directory()
+    
+    # Use proper plugin naming for KiCad 9.0+
+    if "3rdparty" in str(plugins_dir):
+        return plugins_dir / "com_smartcat_ai_assistant"
+    return plugins_dir / "smart_cat"
+
+
+# Downloaded GitHub tarballs, named by commit SHA; oldest-used are evicted past the limit
+ARCHIVE_CACHE_DIR = Path.home() / ".cache" / "smart_cat" / "archives"
+ARCHIVE_CACHE_LIMIT = 200 * 1024 * 1024
+
+_GITHUB_REPO_RE = re.compile(r"^https?://github\.com/([^/]+)/([^/]+?)(?:\.git)?/?$")
+
+
+def _resolve_commit_sha(repo_url, branch):
+    """Commit SHA the branch points at on GitHub, or None if it can't be resolved"""
+    match = _GITHUB_REPO_RE.match(repo_url)
+    if not match:
+        return None
+    
+    owner, repo = match.groups()
+    # The sha media type returns the bare 40-character SHA instead of the commit JSON
+    request = Request(f"https://api.github.com/repos/{owner}/{repo}/commits/{branch}",
+                      headers={"Accept": "application/vnd.github.sha"})
+    try:
+        with urlopen(request, timeout=10) as response:
+            sha = response.read(64).decode("ascii", "replace").strip()
+    except OSError:
+        return None
+    
+    return sha if re.fullmatch(r"[0-9a-f]{40}", sha) else None
+
+
+def _prune_archive_cache():
+    """Delete the least recently used cached archives beyond ARCHIVE_CACHE_LIMIT"""
+    try:
+        with os.scandir(ARCHIVE_CACHE_DIR) as entries:
+            archives = [(entry.stat().st_mtime, entry.stat().st_size, entry.path)
+                        for entry in entries if entry.name.endswith(".tar.gz")]
+    except OSError:
+        return
+    
+    total = 0
+    for _, size, path in sorted(archives, reverse=True):
+        total += size
+        if total > ARCHIVE_CACHE_LIMIT:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class _TeeReader:
+    """File-like reader that copies everything read from source into sink"""
+    
+    def __init__(self, source, sink):
+        self._source = source
+        self._sink = sink
+    
+    def read(self, size=-1):
+        data = self._source.read(size)
+        self._sink.write(data)
+        return data
+
+
+def _extract_archive(archive, extract_dir):
+    """Extract a tar archive, with the safe 'data' filter where available"""
+    if hasattr(tarfile, "data_filter"):
+        # Reject absolute paths, links outside the tree, device files...
+        archive.extractall(extract_dir, filter="data")
+    else:
+        archive.extractall(extract_dir)
 
 
 def download_from_github(repo_url="https://github.com/BWolf-16/Smart-Cat", branch="main"):
@@ -51,19 +294,49 @@ def download_from_github(repo_url="https://github.com/BWolf-16/Smart-Cat", branc
     try:
         # Create temporary directory
         temp_dir = Path(tempfile.mkdtemp())
-        zip_path = temp_dir / "smart-cat.zip"
-        
-        # Download the repository as ZIP
-        download_url = f"{repo_url}/archive/{branch}.zip"
-        print(f"Downloading from: {download_url}")
+        extract_dir = temp_dir / "extracted"
         
-        urlretrieve(download_url, zip_path)
-        print("✓ Download completed")
+        # Pin the download to a commit so the archive can be cached by its SHA
+        sha = _resolve_commit_sha(repo_url, branch)
+        cached_archive = ARCHIVE_CACHE_DIR / f"{sha}.tar.gz" if sha else None
         
-        # Extract the ZIP file
-        extract_dir = temp_dir / "extracted"
-        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            zip_ref.extractall(extract_dir)
+        if cached_archive is not None and cached_archive.exists():
+            print(f"✓ Using cached archive for commit {sha[:12]}")
+            os.utime(cached_archive)  # mark as recently used
+            with tarfile.open(cached_archive, mode="r:gz") as archive:
+                _extract_archive(archive, extract_dir)
+        else:
+            # Download the repository as tar.gz and extract it while it streams in;
+            # when caching, the same bytes are teed into the cache file
+            ref = sha or f"refs/heads/{branch}"
+            download_url = f"{repo_url}/archive/{ref}.tar.gz"
+            print(f"Downloading from: {download_url}")
+            
+            with urlopen(download_url) as response:
+                if cached_archive is None:
+                    with tarfile.open(fileobj=response, mode="r|gz") as archive:
+                        _extract_archive(archive, extract_dir)
+                else:
+                    ARCHIVE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+                    partial = cached_archive.with_name(cached_archive.name + ".tmp")
+                    try:
+                        with open(partial, "wb") as sink:
+                            reader = _TeeReader(response, sink)
+                            with tarfile.open(fileobj=reader, mode="r|gz") as archive:
+                                _extract_archive(archive, extract_dir)
+                            # Drain anything past the tar end marker so the cached copy is complete
+                            while reader.read(1024 * 1024):
+                                pass
+                        os.replace(partial, cached_archive)
+                    except BaseException:
+                        # Also on Ctrl+C: never leave a truncated archive in the cache
+                        try:
+                            os.remove(partial)
+                        except OSError:
+                            pass
+                        raise
+                    _prune_archive_cache()
+            print("✓ Download completed")
         
         # Find the extracted folder (usually Smart-Cat-main or similar)
         extracted_folders = list(extract_dir.iterdir())
@@ -80,62 +353,76 @@ def download_from_github(repo_url="https://github.com/BWolf-16/Smart-Cat", branc
         return None
 
 
+def download_via_sparse(repo_url="https://github.com/BWolf-16/Smart-Cat", branch="main"):
+    """Fetch only the plugin files with a shallow, blobless, sparse git clone
+    
+    Returns the checkout directory, or None if git is unavailable or the clone
+    fails (callers fall back to download_from_github()).
+    """
+    git = shutil.which("git")
+    if git is None:
+        return None
+    
+    print(f"Fetching Smart Cat AI Assistant with git (sparse checkout)...")
+    print(f"Repository: {repo_url}")
+    print(f"Branch: {branch}")
+    
+    # Same layout as download_from_github(): <temp>/extracted/<repo>
+    temp_dir = Path(tempfile.mkdtemp())
+    source_dir = temp_dir / "extracted" / "Smart-Cat"
+    
+    def git_run(*args):
+        subprocess.run([git, *args], check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    
+    try:
+        git_run("clone", "--depth=1", "--filter=blob:none", "--no-checkout",
+                "--branch", branch, repo_url, str(source_dir))
+        # Cone mode always includes the top-level files (the plugin modules)
+        git_run("-C", str(source_dir), "sparse-checkout", "init", "--cone")
+        git_run("-C", str(source_dir), "sparse-checkout", "set", "resources")
+        git_run("-C", str(source_dir), "checkout", branch)
+        
+        print(f"✓ Checked out to: {source_dir}")
+        return source_dir
+        
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"⚠ Sparse git checkout failed ({e}), falling back to archive download")
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        return None
+
+
 def install_from_github(repo_url="https://github.com/BWolf-16/Smart-Cat", branch="main"):
     """Install the plugin directly from GitHub repository"""
+    source_dir = None
+    staging_dir = None
     try:
-        # Download from GitHub
-        source_dir = download_from_github(repo_url, branch)
+        # Download from GitHub - sparse git checkout if possible, else the tarball
+        source_dir = download_via_sparse(repo_url, branch) or download_from_github(repo_url, branch)
         if not source_dir:
             return False
         
         # Get destination path - updated for KiCad 9.0+ naming convention
-        plugins_dir = get_kicad_plugin_directory()
-        
-        # Use proper plugin naming for KiCad 9.0+
-        if "3rdparty" in str(plugins_dir):
-            dest_dir = plugins_dir / "com_smartcat_ai_assistant"
-        else:
-            dest_dir = plugins_dir / "smart_cat"
+        dest_dir = get_plugin_install_directory()
         
         print(f"Installing Smart Cat AI Assistant from GitHub...")
         print(f"Source: {source_dir}")
         print(f"Destination: {dest_dir}")
         
-        # Create destination directory if it doesn't exist
-        dest_dir.parent.mkdir(parents=True, exist_ok=True)
-        
-        # Remove existing installation if present
-        if dest_dir.exists():
-            print("Removing existing installation...")
-            shutil.rmtree(dest_dir)
+        # Build the new install next to the existing one, then swap it in
+        staging_dir = prepare_staging(dest_dir)
         
         # Copy plugin files (exclude non-essential files)
         print("Copying plugin files...")
-        dest_dir.mkdir(exist_ok=True)
+        copied, _ = copy_plugin_files(source_dir, staging_dir)
+        for file_name in copied:
+            print(f"  ✓ Copied {file_name}")
         
-        # List of essential plugin files to copy
-        essential_files = [
-            "__init__.py", "main.py", "ui.py", "AI_API.py", "config.py",
-            "enhanced_parser.py", "kicad_operations.py", "circuit_generator.py",
-            "permissions.py", "parser.py"
-        ]
-        
-        # Copy essential files
-        for file_name in essential_files:
-            source_file = source_dir / file_name
-            if source_file.exists():
-                shutil.copy2(source_file, dest_dir / file_name)
-                print(f"  ✓ Copied {file_name}")
-        
-        # Copy resources folder if it exists
-        resources_src = source_dir / "resources"
-        if resources_src.exists():
-            resources_dest = dest_dir / "resources"
-            shutil.copytree(resources_src, resources_dest)
-            print("  ✓ Copied resources/")
+        if not precompile_plugin(staging_dir):
+            print("✗ Plugin files failed to compile - existing installation left unchanged")
+            return False
         
-        # Clean up temporary files
-        shutil.rmtree(source_dir.parent.parent)
+        swap_into_place(staging_dir, dest_dir)
+        staging_dir = None
         
         print("✓ Plugin installed successfully from GitHub!")
         print("\nNext steps:")
@@ -149,6 +436,13 @@ def install_from_github(repo_url="https://github.com/BWolf-16/Smart-Cat", branch
     except Exception as e:
         print(f"✗ GitHub installation failed: {e}")
         return False
+    
+    finally:
+        # Clean up temporary files (git object files can be read-only on Windows)
+        if staging_dir is not None:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+        if source_dir:
+            shutil.rmtree(source_dir.parent.parent, ignore_errors=True)
 
 
 def install_plugin():
@@ -156,52 +450,40 @@ def install_plugin():
     try:
         # Get source and destination paths - updated for Smart Cat rebranding
         source_dir = Path(__file__).parent
-        plugins_dir = get_kicad_plugin_directory()
-        
-        # Use proper plugin naming for KiCad 9.0+
-        if "3rdparty" in str(plugins_dir):
-            dest_dir = plugins_dir / "com_smartcat_ai_assistant"
-        else:
-            dest_dir = plugins_dir / "smart_cat"
+        dest_dir = get_plugin_install_directory()
         
         print(f"Installing Smart Cat AI Assistant Plugin...")
         print(f"Source: {source_dir}")
         print(f"Destination: {dest_dir}")
         
-        # Create destination directory if it doesn't exist
-        dest_dir.parent.mkdir(parents=True, exist_ok=True)
-        
-        # Remove existing installation if present
-        if dest_dir.exists():
-            print("Removing existing installation...")
-            shutil.rmtree(dest_dir)
-        
-        # Create fresh destination directory
-        dest_dir.mkdir(exist_ok=True)
+        # Skip the reinstall if the source hasn't changed since the last one
+        manifest = _install_manifest(source_dir)
+        manifest_path = dest_dir / MANIFEST_NAME
+        try:
+            if manifest_path.read_text(encoding="utf-8") == manifest:
+                print("✓ Plugin already up to date")
+                return True
+        except OSError:
+            pass
         
-        # List of essential plugin files to copy
-        essential_files = [
-            "__init__.py", "main.py", "ui.py", "AI_API.py", "config.py",
-            "enhanced_parser.py", "kicad_operations.py", "circuit_generator.py",
-            "permissions.py", "parser.py"
-        ]
+        # Build the new install next to the existing one, then swap it in
+        staging_dir = prepare_staging(dest_dir)
         
         # Copy essential files
         print("Copying essential plugin files...")
-        for file_name in essential_files:
-            source_file = source_dir / file_name
-            if source_file.exists():
-                shutil.copy2(source_file, dest_dir / file_name)
-                print(f"  ✓ Copied {file_name}")
-            else:
-                print(f"  ⚠ Missing {file_name}")
+        copied, missing = copy_plugin_files(source_dir, staging_dir)
+        for file_name in copied:
+            print(f"  ✓ Copied {file_name}")
+        if missing:
+            print(f"  ⚠ Missing {', '.join(missing)}")
+        
+        if not precompile_plugin(staging_dir):
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            print("✗ Plugin files failed to compile - existing installation left unchanged")
+            return False
         
-        # Copy resources folder if it exists
-        resources_src = source_dir / "resources"
-        if resources_src.exists():
-            resources_dest = dest_dir / "resources"
-            shutil.copytree(resources_src, resources_dest)
-            print("  ✓ Copied resources/")
+        (staging_dir / MANIFEST_NAME).write_text(manifest, encoding="utf-8")
+        swap_into_place(staging_dir, dest_dir)
         
         print("✓ Plugin installed successfully!")
         print("\nNext steps:")
@@ -220,7 +502,7 @@ def install_plugin():
 def uninstall_plugin():
     """Uninstall the plugin from KiCad"""
     try:
-        dest_dir = get_kicad_plugin_directory() / "smart_cat"
+        dest_dir = get_plugin_install_directory()
         
         if dest_dir.exists():
             print("Uninstalling Smart Cat AI Assistant Plugin...")
@@ -249,17 +531,14 @@ def check_requirements():
         print(f"✗ Python {python_version.major}.{python_version.minor} (requires 3.6+)")
         return False
     
-    # Check for PyQt
-    try:
-        import PyQt5
+    # Check for PyQt - find_spec locates the package without loading the Qt libraries
+    if importlib.util.find_spec("PyQt5") is not None:
         print("✓ PyQt5 available")
-    except ImportError:
-        try:
-            import PyQt6
-            print("✓ PyQt6 available")
-        except ImportError:
-            print("✗ PyQt5 or PyQt6 not found (required for UI)")
-            return False
+    elif importlib.util.find_spec("PyQt6") is not None:
+        print("✓ PyQt6 available")
+    else:
+        print("✗ PyQt5 or PyQt6 not found (required for UI)")
+        return False
     
     # Check KiCad plugin directory
     plugin_dir = get_kicad_plugin_directory()
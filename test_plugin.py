@@ -6,12 +6,37 @@ Run this in KiCad's scripting console to debug plugin issues
 import sys
 import os
 
+def find_plugin_path():
+    """Locate the installed plugin in the newest KiCad version's plugin directories"""
+    try:
+        from setup import get_kicad_plugin_directory
+    except ImportError:
+        print("✗ setup.py not importable - run this script from the Smart Cat source directory")
+        return None
+    
+    plugins_dir = get_kicad_plugin_directory()
+    candidates = [
+        plugins_dir / "com_smartcat_ai_assistant",
+        plugins_dir / "smart_cat",
+        plugins_dir.parent.parent / "3rdparty" / "plugins" / "com_smartcat_ai_assistant",
+    ]
+    for candidate in candidates:
+        if (candidate / "main.py").exists():
+            return str(candidate)
+    
+    print("✗ Installed plugin not found, looked in:")
+    for candidate in candidates:
+        print(f"    {candidate}")
+    return None
+
 def test_plugin_loading():
     """Test if the plugin can be loaded properly"""
     print("Testing Smart Cat AI Assistant plugin loading...")
     
-    # Add plugin path
-    plugin_path = r"C:\Users\bened\Documents\KiCad\9.0\3rdparty\plugins\com_smartcat_ai_assistant"
+    # Add plugin path - fail fast rather than importing some other main module
+    plugin_path = find_plugin_path()
+    if plugin_path is None:
+        return False
     if plugin_path not in sys.path:
         sys.path.insert(0, plugin_path)
         print(f"Added plugin path: {plugin_path}")
@@ -0,0 +1,208 @@
+"""
+Tests for kicad_operations against a stub pcbnew module
+The stub LSET exposes only the methods the SWIG bindings provide
+"""
+
+import importlib
+import os
+import sys
+import tempfile
+import types
+import unittest
+from pathlib import Path
+
+PLUGIN_DIR = Path(__file__).resolve().parent.parent
+# Imported as a package (without running its __init__) so relative imports resolve
+PACKAGE = "smart_cat_under_test"
+
+
+class StubLSET:
+    """LSET with the SWIG surface only - no std::bitset set()/reset()"""
+    
+    def __init__(self, layers=()):
+        self._layers = set(layers)
+    
+    def AddLayer(self, layer_id):
+        self._layers.add(layer_id)
+        return self
+    
+    def Seq(self):
+        return sorted(self._layers)
+
+
+class StubLSETLowercase(StubLSET):
+    """Bindings that name the method addLayer instead"""
+    
+    addLayer = StubLSET.AddLayer
+    AddLayer = None
+
+
+class StubDesignSettings:
+    def __init__(self):
+        self.track_width = 250000
+        self.via_size = 800000
+        self.via_drill = 400000
+        self.m_TrackMinWidth = 200000
+        self.m_ViasMinSize = 500000
+        self.m_ViasMinDrill = 300000
+    
+    def GetCurrentTrackWidth(self):
+        return self.track_width
+    
+    def SetCurrentTrackWidth(self, value):
+        self.track_width = value
+    
+    def GetCurrentViaSize(self):
+        return self.via_size
+    
+    def SetCurrentViaSize(self, value):
+        self.via_size = value
+    
+    def GetCurrentViaDrill(self):
+        return self.via_drill
+    
+    def SetCurrentViaDrill(self, value):
+        self.via_drill = value
+
+
+class StubBoard:
+    def __init__(self, layers, copper_count, file_name=""):
+        self.enabled_layers = StubLSET(layers)
+        self.copper_count = copper_count
+        self.design_settings = StubDesignSettings()
+        self.file_name = file_name
+    
+    def GetFileName(self):
+        return self.file_name
+    
+    def GetTimeStamp(self):
+        # Like KiCad, setters for layer count and design settings don't bump it
+        return 1
+    
+    def GetEnabledLayers(self):
+        return self.enabled_layers
+    
+    def SetEnabledLayers(self, lset):
+        self.enabled_layers = lset
+    
+    def GetCopperLayerCount(self):
+        return self.copper_count
+    
+    def SetCopperLayerCount(self, count):
+        self.copper_count = count
+    
+    def GetDesignSettings(self):
+        return self.design_settings
+
+
+def _make_pcbnew(board, lset_class):
+    pcbnew = types.ModuleType("pcbnew")
+    layer_ids = {
+        "F_Cu": 0, "In1_Cu": 1, "In30_Cu": 30, "B_Cu": 31,
+        "B_Paste": 34, "F_Paste": 35, "B_SilkS": 36, "F_SilkS": 37,
+        "B_Mask": 38, "F_Mask": 39, "Dwgs_User": 40, "Cmts_User": 41,
+        "Edge_Cuts": 44, "B_Fab": 48, "F_Fab": 49,
+    }
+    for name, layer_id in layer_ids.items():
+        setattr(pcbnew, name, layer_id)
+    pcbnew.PCB_LAYER_ID_COUNT = 60
+    pcbnew.LSET = lset_class
+    pcbnew.GetBoard = lambda: board
+    pcbnew.ToMM = lambda value: value / 1e6
+    pcbnew.FromMM = lambda value: int(value * 1e6)
+    pcbnew.Refresh = lambda: None
+    return pcbnew
+
+
+class PluginTestCase(unittest.TestCase):
+    """Imports plugin modules against a stub pcbnew, undone after each test"""
+    
+    def _load(self, board, lset_class, module_name="kicad_operations", missing=()):
+        saved = sys.modules.get("pcbnew")
+        pcbnew = _make_pcbnew(board, lset_class)
+        for name in missing:
+            delattr(pcbnew, name)
+        sys.modules["pcbnew"] = pcbnew
+        package = types.ModuleType(PACKAGE)
+        package.__path__ = [str(PLUGIN_DIR)]
+        sys.modules[PACKAGE] = package
+        self.addCleanup(self._unload, saved)
+        return importlib.import_module(f"{PACKAGE}.{module_name}")
+    
+    @staticmethod
+    def _unload(saved):
+        for name in list(sys.modules):
+            if name == PACKAGE or name.startswith(PACKAGE + "."):
+                del sys.modules[name]
+        if saved is None:
+            sys.modules.pop("pcbnew", None)
+        else:
+            sys.modules["pcbnew"] = saved
+
+
+class RestoreSettingsTest(PluginTestCase):
+    
+    def _check_restore(self, lset_class):
+        board = StubBoard(layers=(0, 31, 37, 44), copper_count=2)
+        kicad_operations = self._load(board, lset_class)
+        ops = kicad_operations.KiCadOperations()
+        self.assertTrue(ops.backup_current_settings())
+        
+        board.enabled_layers = StubLSET((0, 1, 2, 31, 37, 44))
+        board.copper_count = 4
+        board.design_settings.track_width = 500000
+        
+        self.assertTrue(ops.restore_settings())
+        self.assertEqual(board.GetEnabledLayers().Seq(), [0, 31, 37, 44])
+        self.assertEqual(board.GetCopperLayerCount(), 2)
+        self.assertEqual(board.design_settings.track_width, 250000)
+    
+    def test_restore_uses_add_layer(self):
+        self._check_restore(StubLSET)
+    
+    def test_restore_falls_back_to_lowercase_add_layer(self):
+        self._check_restore(StubLSETLowercase)
+
+
+class LayerTypeTest(PluginTestCase):
+    
+    def test_import_survives_missing_layer_constant(self):
+        board = StubBoard(layers=(0, 31), copper_count=2)
+        kicad_operations = self._load(board, StubLSET, missing=("Cmts_User",))
+        self.assertIsNotNone(kicad_operations.kicad_ops)
+    
+    def test_layer_types(self):
+        board = StubBoard(layers=(0, 31), copper_count=2)
+        kicad_operations = self._load(board, StubLSET)
+        ops = kicad_operations.kicad_ops
+        self.assertEqual(ops._get_layer_type(0), "copper_outer")
+        self.assertEqual(ops._get_layer_type(5), "copper_inner")
+        self.assertEqual(ops._get_layer_type(44), "board_edge")
+        self.assertEqual(ops._get_layer_type(55), "technical")
+
+
+class ContextInvalidationTest(PluginTestCase):
+    
+    def setUp(self):
+        fd, self.board_file = tempfile.mkstemp(suffix=".kicad_pcb")
+        os.close(fd)
+        self.addCleanup(os.remove, self.board_file)
+    
+    def test_board_settings_edit_refreshes_comprehensive_context(self):
+        board = StubBoard(layers=(0, 31), copper_count=2, file_name=self.board_file)
+        kicad_operations = self._load(board, StubLSET)
+        enhanced_parser = importlib.import_module(f"{PACKAGE}.enhanced_parser").enhanced_parser
+        
+        before = enhanced_parser.get_comprehensive_context()
+        self.assertIn("Current track width: 0.250mm", before)
+        self.assertIs(enhanced_parser.get_comprehensive_context(), before)
+        
+        ok, message = kicad_operations.kicad_ops.modify_board_settings({"track_width": 0.5})
+        self.assertTrue(ok, message)
+        
+        after = enhanced_parser.get_comprehensive_context()
+        self.assertIn("Current track width: 0.500mm", after)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+"""
+Tests for the modification log in permissions
+"""
+
+import importlib
+import json
+import os
+import sys
+import tempfile
+import types
+import unittest
+from pathlib import Path
+from unittest import mock
+
+PLUGIN_DIR = Path(__file__).resolve().parent.parent
+# Imported as a package (without running its __init__) so relative imports resolve
+PACKAGE = "smart_cat_under_test"
+
+
+class ModificationLogTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.home = tempfile.TemporaryDirectory()
+        self.addCleanup(self.home.cleanup)
+        # config.py puts its directory under the home directory
+        patcher = mock.patch.dict(os.environ, {"HOME": self.home.name, "APPDATA": self.home.name})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        
+        package = types.ModuleType(PACKAGE)
+        package.__path__ = [str(PLUGIN_DIR)]
+        sys.modules[PACKAGE] = package
+        self.addCleanup(self._unload)
+        self.permissions = importlib.import_module(f"{PACKAGE}.permissions")
+        self.addCleanup(self.permissions.modification_logger.close)
+    
+    @staticmethod
+    def _unload():
+        for name in list(sys.modules):
+            if name == PACKAGE or name.startswith(PACKAGE + "."):
+                del sys.modules[name]
+    
+    @staticmethod
+    def _read_lines(path):
+        with open(path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+    
+    def test_global_logger_appends_to_session_log(self):
+        permissions = self.permissions
+        log_path = os.path.join(permissions.config.config_dir, permissions.MODIFICATION_LOG_NAME)
+        
+        permissions.modification_logger.log_modification(
+            "Add copper layers", permissions.ModificationRisk.HIGH, approved=True
+        )
+        
+        entries = self._read_lines(log_path)
+        self.assertEqual([entry["description"] for entry in entries], ["Add copper layers"])
+        self.assertEqual(entries[0]["risk"], "high")
+    
+    def test_log_file_keeps_earlier_sessions(self):
+        permissions = self.permissions
+        log_path = os.path.join(self.home.name, "log.jsonl")
+        
+        first = permissions.ModificationLogger(log_path)
+        first.log_modification("Change track width", permissions.ModificationRisk.LOW, approved=True)
+        first.close()
+        
+        second = permissions.ModificationLogger(log_path)
+        self.addCleanup(second.close)
+        second.log_modification("Move U1", permissions.ModificationRisk.MEDIUM, approved=False)
+        
+        entries = self._read_lines(log_path)
+        self.assertEqual([entry["description"] for entry in entries], ["Change track width", "Move U1"])
+        
+        # Exporting the attached file must not truncate it to this session
+        self.assertTrue(second.export_log(log_path))
+        self.assertEqual(len(self._read_lines(log_path)), 2)
+        
+        export_path = os.path.join(self.home.name, "export.jsonl")
+        self.assertTrue(second.export_log(export_path))
+        self.assertEqual([entry["description"] for entry in self._read_lines(export_path)], ["Move U1"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,9 +3,14 @@ KiCat AI Assistant UI Components
 PyQt-based interface for the AI assistant panel
 """
 
+import re
 import sys
 import os
-from typing import Optional, List, Dict, Any
+from collections import deque
+from contextlib import contextmanager
+from functools import lru_cache, wraps
+from time import localtime, time
+from typing import Optional, List, Dict, Any, Deque, Tuple
 
 try:
     from PyQt5.QtWidgets import (
@@ -13,10 +18,17 @@ try:
         QTextEdit, QLineEdit, QPushButton, QLabel, QScrollArea,
         QFrame, QSplitter, QDialog, QFormLayout, QComboBox,
         QCheckBox, QSpinBox, QMessageBox, QFileDialog, QTabWidget,
-        QGroupBox, QGridLayout, QProgressBar, QSystemTrayIcon
+        QGroupBox, QGridLayout, QProgressBar, QSystemTrayIcon,
+        QListView, QStyledItemDelegate, QPlainTextEdit
+    )
+    from PyQt5.QtCore import (
+        Qt, QObject, QRunnable, QThreadPool, pyqtSignal, pyqtSlot, QTimer, QSize,
+        QAbstractListModel, QModelIndex, QEvent, QPointF
+    )
+    from PyQt5.QtGui import (
+        QFont, QPixmap, QIcon, QTextCursor, QPalette, QTextDocument,
+        QColor, QTextBlockFormat, QTextCharFormat, QPainter, QTextLayout, QTextOption
     )
-    from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer, QSize
-    from PyQt5.QtGui import QFont, QPixmap, QIcon, QTextCursor, QPalette
     
     PYQT_AVAILABLE = True
 except ImportError:
@@ -26,10 +38,17 @@ except ImportError:
             QTextEdit, QLineEdit, QPushButton, QLabel, QScrollArea,
             QFrame, QSplitter, QDialog, QFormLayout, QComboBox,
             QCheckBox, QSpinBox, QMessageBox, QFileDialog, QTabWidget,
-            QGroupBox, QGridLayout, QProgressBar, QSystemTrayIcon
+            QGroupBox, QGridLayout, QProgressBar, QSystemTrayIcon,
+            QListView, QStyledItemDelegate, QPlainTextEdit
+        )
+        from PyQt6.QtCore import (
+            Qt, QObject, QRunnable, QThreadPool, pyqtSignal, pyqtSlot, QTimer, QSize,
+            QAbstractListModel, QModelIndex, QEvent, QPointF
+        )
+        from PyQt6.QtGui import (
+            QFont, QPixmap, QIcon, QTextCursor, QPalette, QTextDocument,
+            QColor, QTextBlockFormat, QTextCharFormat, QPainter, QTextLayout, QTextOption
         )
-        from PyQt6.QtCore import Qt, QThread, pyqtSignal, QTimer, QSize
-        from PyQt6.QtGui import QFont, QPixmap, QIcon, QTextCursor, QPalette
         
         PYQT_AVAILABLE = True
     except ImportError:
@@ -38,11 +57,240 @@ except ImportError:
 
 if PYQT_AVAILABLE:
     from .config import config
-    from .AI_API import AIAPIClient
+    from .AI_API import AIAPIClient, QT_NETWORK_AVAILABLE
     from .enhanced_parser import enhanced_parser
     from .permissions import permission_manager, modification_logger, ModificationRisk
 
 
+# Words in a user request that suggest a design change; matched at word
+# starts so inflections like "moved" or "updates" still count
+_MOD_KEYWORDS_RE = re.compile(
+    r"\b(?:change|modify|move|rotate|delete|add|place|route|connect|fix|improve|update|replace)",
+    re.IGNORECASE
+)
+
+
+
+def _trie_pattern(words) -> str:
+    """Regex alternation of words with their shared prefixes factored out.
+    
+    re tries a flat alternation branch by branch at every position; in the
+    factored form, e.g. "mo(?:dify|ve)", a position is rejected after one check
+    of its first character.
+    """
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}  # end of word
+    
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        pattern = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        return f"(?:{pattern})?" if "" in node else pattern
+    
+    return build(trie)
+
+
+# Phrases in an AI response that suggest it is proposing a change
+_MOD_INDICATORS = (
+    'i can help you', 'let me', 'i would', 'i suggest changing',
+    'modify', 'change', 'move', 'rotate', 'adjust', 'improve',
+    'would you like me to', 'shall i', 'permission to'
+)
+_MOD_INDICATORS_RE = re.compile(_trie_pattern(_MOD_INDICATORS), re.IGNORECASE)
+
+
+def _contains_modification_suggestions(response: str) -> bool:
+    """Check if response contains modification suggestions"""
+    return bool(_MOD_INDICATORS_RE.search(response))
+
+
+# Static chat banners, built once and reused whenever the configuration is re-checked
+_WELCOME_HTML = """
+<div style='background-color: #f0f8ff; padding: 15px; border-radius: 8px; margin: 5px;'>
+<h3>🚀 Welcome to KiCat AI Assistant!</h3>
+<p><strong>Enhanced with Read/Write Access & Memory</strong></p>
+
+<h4>🔧 Setup Required:</h4>
+<ol>
+<li>Click the settings button (⚙) in the top right</li>
+<li>Enter your Claude or OpenAI API key</li>
+<li>Select your preferred model</li>
+<li>Click "Test API Connection" to verify</li>
+<li>Save your settings</li>
+</ol>
+
+<h4>🧠 New Capabilities:</h4>
+<ul>
+<li><strong>Deep PCB Analysis:</strong> Comprehensive design review including signal integrity, power distribution, thermal management</li>
+<li><strong>Design Modifications:</strong> I can make changes to your design (with your permission)</li>
+<li><strong>Memory:</strong> I remember our conversation and previous design decisions</li>
+<li><strong>Manufacturing Expertise:</strong> DFM analysis, assembly considerations, and cost optimization</li>
+<li><strong>Safety Features:</strong> All changes require approval and can be undone</li>
+</ul>
+
+<p>Once configured, I can help you create better PCB designs with intelligent analysis and safe modifications!</p>
+</div>
+"""
+
+_READY_HTML = """
+<div style='background-color: #f0fff0; padding: 15px; border-radius: 8px; margin: 5px;'>
+<h3>🤖 KiCat AI Assistant Ready!</h3>
+<p><strong>Enhanced AI with Read/Write Access & Memory</strong></p>
+
+<h4>🔍 I can analyze:</h4>
+<ul>
+<li><strong>Components:</strong> Placement, selection, thermal considerations</li>
+<li><strong>Signal Integrity:</strong> Trace routing, impedance, crosstalk, EMI</li>
+<li><strong>Power Distribution:</strong> PDN analysis, decoupling, voltage regulation</li>
+<li><strong>Manufacturing:</strong> DFM, assembly, cost optimization</li>
+<li><strong>Footprints & Libraries:</strong> Usage analysis and recommendations</li>
+</ul>
+
+<h4>⚡ I can modify your design:</h4>
+<ul>
+<li>Component placement and routing optimization</li>
+<li>Design rule adjustments</li>
+<li>Layer stackup improvements</li>
+<li>All changes require your permission</li>
+<li>Full undo capability</li>
+</ul>
+
+<h4>🧠 Memory Features:</h4>
+<ul>
+<li>Remember our conversation and design decisions</li>
+<li>Track modification history</li>
+<li>Learn your preferences over time</li>
+</ul>
+
+<p><strong>Try asking:</strong> "Analyze my PCB design comprehensively" or "How can I improve signal integrity?"</p>
+</div>
+"""
+
+# Markdown-style emphasis; the markers must hug the text so "* item" bullets are left alone
+_BOLD_RE = re.compile(r"\*\*(?!\s)(.+?)(?<!\s)\*\*", re.DOTALL)
+_ITAL_RE = re.compile(r"\*(?!\s)(.+?)(?<!\s)\*", re.DOTALL)
+
+
+def _emphasis_runs(text: str):
+    """Split text into (run, bold, italic) pieces following its emphasis markers"""
+    pos = 0
+    for match in _BOLD_RE.finditer(text):
+        yield from _italic_runs(text[pos:match.start()], False)
+        yield from _italic_runs(match.group(1), True)
+        pos = match.end()
+    yield from _italic_runs(text[pos:], False)
+
+
+def _italic_runs(text: str, bold: bool):
+    pos = 0
+    for match in _ITAL_RE.finditer(text):
+        if match.start() > pos:
+            yield text[pos:match.start()], bold, False
+        yield match.group(1), bold, True
+        pos = match.end()
+    if pos < len(text):
+        yield text[pos:], bold, False
+
+
+def _emphasis_char_formats() -> Dict[Tuple[bool, bool], QTextCharFormat]:
+    """Char formats for message text keyed by (bold, italic)"""
+    formats = {}
+    for bold in (False, True):
+        for italic in (False, True):
+            char_fmt = QTextCharFormat()
+            char_fmt.setFontWeight(QFont.Bold if bold else QFont.Normal)
+            char_fmt.setFontItalic(italic)
+            formats[bold, italic] = char_fmt
+    return formats
+
+
+def _link_char_format() -> QTextCharFormat:
+    link_fmt = QTextCharFormat()
+    link_fmt.setAnchor(True)
+    link_fmt.setForeground(QColor("#0000ee"))
+    link_fmt.setFontUnderline(True)
+    return link_fmt
+
+# Longer messages are cropped in the chat view; the full text opens in a dialog
+_MAX_BUBBLE_CHARS = 8192
+# Lines longer than this get zero-width break points so the layout can wrap them
+_MAX_LINE_CHARS = 2000
+_FULLTEXT_SCHEME = "fulltext://"
+
+# Chat bubble backgrounds keyed by ChatMessage.is_user; bubbles are drawn from
+# prebuilt text formats or by the list delegate, never from CSS
+_BUBBLE_COLORS = {True: "#e6f3ff", False: "#f0f8f0"}
+
+
+@lru_cache(maxsize=64)
+def _fmt_ts(epoch_sec: int) -> str:
+    """HH:MM:SS for a second; messages in the same second share one interned string"""
+    t = localtime(epoch_sec)
+    return sys.intern(f"{t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d}")
+
+
+@lru_cache(maxsize=None)
+def _cfg(key: str, default: Any = None) -> Any:
+    """Cached config.get for per-message reads; cleared when settings change"""
+    return config.get(key, default)
+
+
+@contextmanager
+def _updates_paused(widget):
+    """Suspend repaints of widget so a group of property changes paints once"""
+    was_enabled = widget.updatesEnabled()
+    widget.setUpdatesEnabled(False)
+    try:
+        yield
+    finally:
+        # Leave an enclosing pause in charge of re-enabling
+        if was_enabled:
+            widget.setUpdatesEnabled(True)
+
+
+def qthrottled(timeout: int = 150):
+    """Coalesce bursts of calls to a QObject method into one per `timeout` ms.
+    
+    The first call runs immediately; calls arriving while the throttle timer is
+    running collapse into a single trailing call when it fires.
+    """
+    def decorator(func):
+        state_attr = f"_{func.__name__}_throttle"
+        
+        @wraps(func)
+        def wrapper(self, *args):
+            state = self.__dict__.get(state_attr)
+            if state is None:
+                timer = QTimer(self)
+                timer.setSingleShot(True)
+                timer.setInterval(timeout)
+                state = {"timer": timer, "pending": None}
+                
+                def flush():
+                    pending = state["pending"]
+                    if pending is not None:
+                        state["pending"] = None
+                        func(self, *pending)
+                        timer.start()
+                
+                timer.timeout.connect(flush)
+                self.__dict__[state_attr] = state
+            
+            if state["timer"].isActive():
+                state["pending"] = args
+                return
+            func(self, *args)
+            state["timer"].start()
+        
+        return wrapper
+    return decorator
+
+
 class ChatMessage:
     """Represents a single chat message"""
     
@@ -53,53 +301,304 @@ class ChatMessage:
     
     @staticmethod
     def _get_timestamp() -> str:
-        from datetime import datetime
-        return datetime.now().strftime("%H:%M:%S")
+        return _fmt_ts(int(time()))
+
+
+def _open_question(parent, title: str, text: str, on_finished) -> QMessageBox:
+    """Show a window-modal Yes/No box without spinning a nested event loop.
+    
+    on_finished receives the clicked standard button once the box closes.
+    """
+    box = QMessageBox(QMessageBox.Question, title, text, QMessageBox.Yes | QMessageBox.No, parent)
+    box.setDefaultButton(QMessageBox.No)
+    box.setAttribute(Qt.WA_DeleteOnClose)
+    box.finished.connect(on_finished)
+    box.open()
+    return box
 
 
-class APITestThread(QThread):
-    """Thread for testing API connection without blocking UI"""
+class _APITestSignals(QObject):
+    """Signals for APITestRunnable (QRunnable is not a QObject)"""
     
     result_ready = pyqtSignal(bool, str)  # success, message
+
+
+class APITestRunnable(QRunnable):
+    """Pool task for testing API connection without blocking UI"""
     
-    def __init__(self, client, parent=None):
-        super().__init__(parent)
+    def __init__(self, client, signals: Optional[_APITestSignals] = None):
+        super().__init__()
         self.client = client
+        self.signals = signals if signals is not None else _APITestSignals()
     
     def run(self):
         try:
             success, message = self.client.test_connection()
-            self.result_ready.emit(success, message)
+            self.signals.result_ready.emit(success, message)
         except Exception as e:
-            self.result_ready.emit(False, f"Test failed: {str(e)}")
+            self.signals.result_ready.emit(False, f"Test failed: {str(e)}")
 
 
-class ChatThread(QThread):
-    """Thread for handling AI API calls without blocking UI"""
+class _ChatSignals(QObject):
+    """Signals for ChatRunnable (QRunnable is not a QObject)"""
     
     response_ready = pyqtSignal(str)  # AI response
     error_occurred = pyqtSignal(str)  # Error message
+
+
+class ChatRunnable(QRunnable):
+    """Pool task for handling AI API calls without blocking UI"""
     
-    def __init__(self, client, message: str, context: str = "", parent=None):
-        super().__init__(parent)
+    def __init__(self, client, message: str, context: str = "",
+                 signals: Optional[_ChatSignals] = None):
+        super().__init__()
         self.client = client
         self.message = message
         self.context = context
+        self.signals = signals if signals is not None else _ChatSignals()
     
     def run(self):
         try:
             response = self.client.send_message(self.message, self.context)
             if response:
-                self.response_ready.emit(response)
+                self.signals.response_ready.emit(response)
             else:
-                self.error_occurred.emit("No response received from API")
+                self.signals.error_occurred.emit("No response received from API")
         except Exception as e:
-            self.error_occurred.emit(f"Error: {str(e)}")
+            self.signals.error_occurred.emit(f"Error: {str(e)}")
+
+
+class FunctionRunnable(QRunnable):
+    """Pool task running a plain callable"""
+    
+    def __init__(self, func):
+        super().__init__()
+        self.func = func
+    
+    def run(self):
+        self.func()
+
+
+def _run_in_pool(func):
+    """Run func on the shared thread pool"""
+    QThreadPool.globalInstance().start(FunctionRunnable(func))
+
+
+class ChatListModel(QAbstractListModel):
+    """List model holding the chat messages, optionally preceded by a banner row"""
+    
+    _LINK_TEXT = "[show full]"
+    
+    def __init__(self, font: QFont, parent=None):
+        super().__init__(parent)
+        self._font = font
+        self._char_fmts = _emphasis_char_formats()
+        self._link_fmt = _link_char_format()
+        self._wrap_option = QTextOption()
+        self._wrap_option.setWrapMode(QTextOption.WrapAtWordBoundaryOrAnywhere)
+        # Messages: [ChatMessage, cropped text, full-text id or None, cached layout entry]
+        # Banner:   [None, HTML, None, laid-out QTextDocument]
+        self._rows: List[list] = []
+    
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if index.isValid() and role == Qt.DisplayRole:
+            return self._rows[index.row()][1]
+        return None
+    
+    def message(self, row: int) -> Optional[ChatMessage]:
+        """The row's message, or None for a banner"""
+        return self._rows[row][0]
+    
+    def extend_messages(self, messages: List[Tuple[ChatMessage, str, Optional[int]]], max_rows: int):
+        """Append (message, cropped text, full-text id) rows in one insert.
+        
+        The oldest rows beyond max_rows are dropped.
+        """
+        row = len(self._rows)
+        self.beginInsertRows(QModelIndex(), row, row + len(messages) - 1)
+        self._rows.extend([message, text, full_id, None] for message, text, full_id in messages)
+        self.endInsertRows()
+        
+        excess = len(self._rows) - max_rows
+        if excess > 0:
+            self.beginRemoveRows(QModelIndex(), 0, excess - 1)
+            del self._rows[:excess]
+            self.endRemoveRows()
+    
+    def update_last_message(self, text: str, full_id: Optional[int]) -> QModelIndex:
+        """Replace the newest row's text after its message changed; returns its index"""
+        row = len(self._rows) - 1
+        self._rows[row][1:] = [text, full_id, None]
+        index = self.index(row)
+        self.dataChanged.emit(index, index)
+        return index
+    
+    def reset_html(self, html: str):
+        """Replace all rows with a single banner"""
+        self.beginResetModel()
+        self._rows = [[None, html, None, None]]
+        self.endResetModel()
+    
+    def document(self, row: int, width: int) -> QTextDocument:
+        """Return the banner row laid out for width, building it on first use"""
+        entry = self._rows[row]
+        doc = entry[3]
+        if doc is None:
+            doc = QTextDocument()
+            doc.setDefaultFont(self._font)
+            doc.setHtml(entry[1])
+            entry[3] = doc
+        if doc.textWidth() != width:
+            doc.setTextWidth(width)
+        return doc
+    
+    def layout(self, row: int, width: int) -> Tuple[QTextLayout, float]:
+        """Return the message row's text layout broken into lines for width, and its height.
+        
+        The text is shaped once per message; a width change only re-runs line breaking.
+        """
+        entry = self._rows[row]
+        cached = entry[3]
+        if cached is None:
+            cached = entry[3] = [None, self._build_layout(entry[0], entry[1], entry[2]), 0.0]
+        if cached[0] != width:
+            layout = cached[1]
+            y = 0.0
+            layout.beginLayout()
+            while True:
+                line = layout.createLine()
+                if not line.isValid():
+                    break
+                line.setLineWidth(width)
+                line.setPosition(QPointF(0, y))
+                y += line.height()
+            layout.endLayout()
+            cached[0] = width
+            cached[2] = y
+        return cached[1], cached[2]
+    
+    def anchor_at(self, row: int, width: int, point: QPointF) -> str:
+        """Link target at a point relative to the message row's text, or an empty string"""
+        full_id = self._rows[row][2]
+        if full_id is None:
+            return ""
+        layout, _ = self.layout(row, width)
+        link_start = len(layout.text()) - len(self._LINK_TEXT)
+        for i in range(layout.lineCount()):
+            line = layout.lineAt(i)
+            if line.y() <= point.y() < line.y() + line.height():
+                if point.x() < line.naturalTextWidth() and line.xToCursor(point.x()) >= link_start:
+                    return f"{_FULLTEXT_SCHEME}{full_id}"
+                break
+        return ""
+    
+    def _build_layout(self, message: ChatMessage, text: str, full_id: Optional[int]) -> QTextLayout:
+        sender = "You" if message.is_user else "KiCat AI"
+        parts = [f"{sender} ({message.timestamp}):", "\u2028"]
+        formats = [self._format_range(0, len(parts[0]), self._char_fmts[True, False])]
+        pos = len(parts[0]) + 1
+        
+        # Line separators: QTextLayout breaks on them but treats "\n" as an ordinary glyph
+        for run, bold, italic in _emphasis_runs(text):
+            if bold or italic:
+                formats.append(self._format_range(pos, len(run), self._char_fmts[bold, italic]))
+            parts.append(run.replace('\n', '\u2028'))
+            pos += len(run)
+        
+        if full_id is not None:
+            parts.append(" … ")
+            parts.append(self._LINK_TEXT)
+            formats.append(self._format_range(pos + 3, len(self._LINK_TEXT), self._link_fmt))
+        
+        layout = QTextLayout("".join(parts), self._font)
+        layout.setTextOption(self._wrap_option)
+        layout.setFormats(formats)
+        layout.setCacheEnabled(True)
+        return layout
+    
+    @staticmethod
+    def _format_range(start: int, length: int, char_fmt: QTextCharFormat) -> QTextLayout.FormatRange:
+        format_range = QTextLayout.FormatRange()
+        format_range.start = start
+        format_range.length = length
+        format_range.format = char_fmt
+        return format_range
+
+
+class ChatBubbleDelegate(QStyledItemDelegate):
+    """Paints ChatListModel rows: messages as bubbles, banners as rich text"""
+    
+    _MARGIN = 5
+    _PADDING = 8
+    _ACCENT_WIDTH = 3
+    _ACCENTS = {True: QColor("#2196f3"), False: QColor("#4caf50")}
+    _BACKGROUNDS = {is_user: QColor(color) for is_user, color in _BUBBLE_COLORS.items()}
+    
+    def _text_width(self) -> int:
+        inset = 2 * (self._MARGIN + self._PADDING) + self._ACCENT_WIDTH
+        return max(self.parent().viewport().width() - inset, 1)
+    
+    def _text_origin(self, rect) -> QPointF:
+        """Top-left of a message's text inside the row rect"""
+        return QPointF(rect.left() + self._MARGIN + self._ACCENT_WIDTH + self._PADDING,
+                       rect.top() + self._MARGIN + self._PADDING)
+    
+    def paint(self, painter, option, index):
+        model = index.model()
+        row = index.row()
+        message = model.message(row)
+        painter.save()
+        if message is None:
+            painter.translate(option.rect.topLeft())
+            model.document(row, max(self.parent().viewport().width(), 1)).drawContents(painter)
+        else:
+            layout, _ = model.layout(row, self._text_width())
+            bubble = option.rect.adjusted(self._MARGIN, self._MARGIN, -self._MARGIN, -self._MARGIN)
+            painter.setRenderHint(QPainter.Antialiasing)
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(self._BACKGROUNDS[message.is_user])
+            painter.drawRoundedRect(bubble, 5, 5)
+            painter.fillRect(bubble.left(), bubble.top(), self._ACCENT_WIDTH, bubble.height(),
+                             self._ACCENTS[message.is_user])
+            
+            painter.setPen(option.palette.color(QPalette.Text))
+            layout.draw(painter, self._text_origin(option.rect))
+        painter.restore()
+    
+    def sizeHint(self, option, index):
+        model = index.model()
+        row = index.row()
+        if model.message(row) is None:
+            doc = model.document(row, max(self.parent().viewport().width(), 1))
+            return QSize(int(doc.textWidth()), int(doc.size().height()))
+        
+        _, height = model.layout(row, self._text_width())
+        return QSize(self.parent().viewport().width(), int(height) + 2 * (self._MARGIN + self._PADDING))
+    
+    def anchor_at(self, index, rect, pos) -> str:
+        """Link target at a viewport position inside the row's rect"""
+        model = index.model()
+        row = index.row()
+        if model.message(row) is None:
+            doc = model.document(row, max(self.parent().viewport().width(), 1))
+            return doc.documentLayout().anchorAt(QPointF(pos - rect.topLeft()))
+        return model.anchor_at(row, self._text_width(), QPointF(pos) - self._text_origin(rect))
 
 
 class PermissionDialog(QDialog):
     """Dialog for requesting user permission for design modifications"""
     
+    _RISK_STYLE = {
+        ModificationRisk.SAFE: ("🟢", "green"),
+        ModificationRisk.LOW: ("🟡", "orange"),
+        ModificationRisk.MEDIUM: ("🟠", "darkorange"),
+        ModificationRisk.HIGH: ("🔴", "red"),
+        ModificationRisk.CRITICAL: ("⚠️", "darkred")
+    }
+    
     def __init__(self, description: str, risk: ModificationRisk, details: str = "", parent=None):
         super().__init__(parent)
         self.setWindowTitle("KiCat AI - Permission Required")
@@ -134,15 +633,7 @@ class PermissionDialog(QDialog):
         content_layout.addWidget(desc_label)
         
         # Risk level
-        risk_colors = {
-            ModificationRisk.SAFE: ("🟢", "green"),
-            ModificationRisk.LOW: ("🟡", "orange"), 
-            ModificationRisk.MEDIUM: ("🟠", "darkorange"),
-            ModificationRisk.HIGH: ("🔴", "red"),
-            ModificationRisk.CRITICAL: ("⚠️", "darkred")
-        }
-        
-        risk_icon, risk_color = risk_colors.get(self.risk, ("❓", "black"))
+        risk_icon, risk_color = self._RISK_STYLE.get(self.risk, ("❓", "black"))
         risk_text = self.risk.value.replace('_', ' ').title()
         
         risk_label = QLabel(f"<b>Risk Level:</b> {risk_icon} <span style='color: {risk_color}'>{risk_text}</span>")
@@ -192,6 +683,7 @@ class MemoryPanel(QWidget):
     def __init__(self, ai_client: AIAPIClient, parent=None):
         super().__init__(parent)
         self.ai_client = ai_client
+        self._last_memory_content: Optional[str] = None
         self.setup_ui()
     
     def setup_ui(self):
@@ -227,6 +719,8 @@ class MemoryPanel(QWidget):
         # Initial refresh
         self.refresh_memory()
     
+    @pyqtSlot()
+    @qthrottled(timeout=200)
     def refresh_memory(self):
         """Refresh the memory display"""
         try:
@@ -236,35 +730,63 @@ class MemoryPanel(QWidget):
             content = f"=== Conversation Summary ===\n{summary}\n\n"
             content += f"=== Modification Log ===\n{session_log}"
             
+            # Most replies leave the memory unchanged; skip the re-layout then
+            if content == self._last_memory_content:
+                return
+            self._last_memory_content = content
             self.memory_display.setPlainText(content)
         except Exception as e:
+            self._last_memory_content = None
             self.memory_display.setPlainText(f"Error loading memory: {e}")
     
+    @pyqtSlot()
     def clear_memory(self):
         """Clear AI memory after confirmation"""
-        reply = QMessageBox.question(
+        _open_question(
             self, "Clear Memory",
             "This will clear the AI's conversation memory and design decisions.\n\nAre you sure?",
-            QMessageBox.Yes | QMessageBox.No,
-            QMessageBox.No
+            self._on_clear_confirmed
         )
+    
+    @pyqtSlot(int)
+    def _on_clear_confirmed(self, result: int):
+        """Clear memory once the confirmation box closes with Yes"""
+        if result != QMessageBox.Yes:
+            return
+        
+        self.ai_client.clear_all()
+        modification_logger.log_entries.clear()
+        self.refresh_memory()
         
-        if reply == QMessageBox.Yes:
-            self.ai_client.clear_all()
-            modification_logger.log_entries.clear()
-            self.refresh_memory()
-            QMessageBox.information(self, "Memory Cleared", "AI memory has been cleared successfully.")
+        info = QMessageBox(QMessageBox.Information, "Memory Cleared",
+                           "AI memory has been cleared successfully.", QMessageBox.Ok, self)
+        info.setAttribute(Qt.WA_DeleteOnClose)
+        info.open()
 
 
 class SettingsDialog(QDialog):
     """Settings dialog for API configuration"""
     
+    _PROVIDER_BASE_URLS = {
+        "claude": "https://api.anthropic.com",
+        "openai": "https://api.openai.com",
+        "custom": "https://api.custom-provider.com",
+    }
+    
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("KiCat AI Assistant Settings")
         self.setModal(True)
         self.setFixedSize(500, 400)
         
+        # Provider switches happen several times while the dialog loads
+        self._models_by_provider = config.get_available_models()
+        
+        # One test client and signal holder, reused for every connection test
+        self._test_client: Optional[AIAPIClient] = None
+        self._test_signals = _APITestSignals(self)
+        self._test_signals.result_ready.connect(self.on_test_result)
+        
         self.setup_ui()
         self.load_settings()
     
@@ -341,6 +863,17 @@ class SettingsDialog(QDialog):
         self.include_drc_check.setChecked(True)
         advanced_layout.addRow("", self.include_drc_check)
         
+        # Chat view: rich QTextEdit, lighter QPlainTextEdit, or virtualized QListView
+        self.chat_view_combo = QComboBox()
+        self.chat_view_combo.addItems(["rich", "plain", "list"])
+        self.chat_view_combo.setToolTip("plain and list scale better for long sessions")
+        advanced_layout.addRow("Chat View:", self.chat_view_combo)
+        
+        # Keep window on top
+        self.always_on_top_check = QCheckBox("Keep assistant window on top")
+        self.always_on_top_check.setChecked(False)
+        advanced_layout.addRow("", self.always_on_top_check)
+        
         tabs.addTab(advanced_tab, "Advanced")
         
         layout.addWidget(tabs)
@@ -364,19 +897,17 @@ class SettingsDialog(QDialog):
         
         layout.addLayout(button_layout)
     
+    @pyqtSlot(str)
     def on_provider_changed(self, provider: str):
         """Update model list when provider changes"""
-        models = config.get_available_models().get(provider, [])
+        models = self._models_by_provider.get(provider, [])
         self.model_combo.clear()
         self.model_combo.addItems(models)
         
         # Update base URL
-        if provider == "claude":
-            self.base_url_input.setText("https://api.anthropic.com")
-        elif provider == "openai":
-            self.base_url_input.setText("https://api.openai.com")
-        elif provider == "custom":
-            self.base_url_input.setText("https://api.custom-provider.com")
+        base_url = self._PROVIDER_BASE_URLS.get(provider)
+        if base_url:
+            self.base_url_input.setText(base_url)
     
     def load_settings(self):
         """Load current settings into the dialog"""
@@ -389,34 +920,47 @@ class SettingsDialog(QDialog):
         self.history_limit_spin.setValue(config.get("chat_history_limit", 50))
         self.auto_context_check.setChecked(config.get("auto_detect_context", True))
         self.include_drc_check.setChecked(config.get("include_drc_errors", True))
+        self.chat_view_combo.setCurrentText(config.get("chat_view", "rich"))
+        self.always_on_top_check.setChecked(config.get("always_on_top", False))
     
+    @pyqtSlot()
     def save_settings(self):
         """Save settings and close dialog"""
-        config.set_api_provider(self.provider_combo.currentText())
-        config.set_api_key(self.api_key_input.text())
-        config.set_model(self.model_combo.currentText())
-        config.set("api_base_url", self.base_url_input.text())
-        config.set("max_tokens", self.max_tokens_spin.value())
-        config.set("temperature", self.temperature_spin.value() / 100.0)
-        config.set("chat_history_limit", self.history_limit_spin.value())
-        config.set("auto_detect_context", self.auto_context_check.isChecked())
-        config.set("include_drc_errors", self.include_drc_check.isChecked())
+        config.update({
+            "api_provider": self.provider_combo.currentText(),
+            "api_key": self.api_key_input.text(),
+            "model": self.model_combo.currentText(),
+            "api_base_url": self.base_url_input.text(),
+            "max_tokens": self.max_tokens_spin.value(),
+            "temperature": self.temperature_spin.value() / 100.0,
+            "chat_history_limit": self.history_limit_spin.value(),
+            "auto_detect_context": self.auto_context_check.isChecked(),
+            "include_drc_errors": self.include_drc_check.isChecked(),
+            "chat_view": self.chat_view_combo.currentText(),
+            "always_on_top": self.always_on_top_check.isChecked()
+        })
+        _cfg.cache_clear()
         
         self.accept()
     
+    @pyqtSlot()
     def reset_settings(self):
         """Reset all settings to defaults"""
-        reply = QMessageBox.question(
+        _open_question(
             self, "Reset Settings",
             "Are you sure you want to reset all settings to defaults?",
-            QMessageBox.Yes | QMessageBox.No,
-            QMessageBox.No
+            self._on_reset_confirmed
         )
-        
-        if reply == QMessageBox.Yes:
+    
+    @pyqtSlot(int)
+    def _on_reset_confirmed(self, result: int):
+        """Reset settings once the confirmation box closes with Yes"""
+        if result == QMessageBox.Yes:
             config.reset_to_defaults()
+            _cfg.cache_clear()
             self.load_settings()
     
+    @pyqtSlot()
     def test_api_connection(self):
         """Test the API connection"""
         self.test_button.setEnabled(False)
@@ -430,13 +974,15 @@ class SettingsDialog(QDialog):
             "api_base_url": self.base_url_input.text()
         }
         
-        client = AIAPIClient(temp_config)
+        if self._test_client is None:
+            self._test_client = AIAPIClient(temp_config)
+        else:
+            self._test_client.update_config(temp_config)
         
-        # Start test thread
-        self.test_thread = APITestThread(client, self)
-        self.test_thread.result_ready.connect(self.on_test_result)
-        self.test_thread.start()
+        # Run the test on the shared thread pool
+        QThreadPool.globalInstance().start(APITestRunnable(self._test_client, self._test_signals))
     
+    @pyqtSlot(bool, str)
     def on_test_result(self, success: bool, message: str):
         """Handle API test result"""
         self.test_button.setEnabled(True)
@@ -458,12 +1004,52 @@ class SmartCatAssistantWindow(QMainWindow):
         super().__init__(parent)
         
         self.setWindowTitle("KiCat AI Assistant")
-        self.setWindowFlags(Qt.Window | Qt.WindowStaysOnTopHint)
+        flags = Qt.Window
+        if _cfg("always_on_top", False):
+            flags |= Qt.WindowStaysOnTopHint
+        self.setWindowFlags(flags)
         
         # Initialize components
         self.ai_client = AIAPIClient()
         self.context_parser = enhanced_parser
-        self.chat_history: List[ChatMessage] = []
+        # Bounded history: the oldest message drops off once the limit is reached
+        self.chat_history: Deque[ChatMessage] = deque(maxlen=_cfg("chat_history_limit", 50))
+        
+        # Shared by every ChatRunnable so the slots are wired only once
+        self._chat_signals = _ChatSignals(self)
+        self._chat_signals.response_ready.connect(self.on_response_received)
+        self._chat_signals.error_occurred.connect(self.on_error_occurred)
+        # (message, error text, repeat count) of the last error bubble
+        self._last_error: Optional[Tuple[ChatMessage, str, int]] = None
+        
+        # Uncropped text of messages too long for the chat view, keyed by link id
+        self._full_messages: Dict[int, str] = {}
+        self._next_full_id = 0
+        
+        # Messages queued during this event-loop turn, inserted together by _flush_chat
+        self._pending_messages: List[ChatMessage] = []
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(0)
+        self._flush_timer.timeout.connect(self._flush_chat)
+        
+        # Text formats for bubbles in the text views, inserted without going through HTML
+        block_fmts: Dict[bool, QTextBlockFormat] = {}
+        for is_user, color in _BUBBLE_COLORS.items():
+            block_fmt = QTextBlockFormat()
+            block_fmt.setBackground(QColor(color))
+            block_fmt.setTopMargin(5)
+            block_fmt.setBottomMargin(5)
+            block_fmt.setLeftMargin(5)
+            block_fmt.setRightMargin(5)
+            block_fmts[is_user] = block_fmt
+        self._user_block_fmt = block_fmts[True]
+        self._ai_block_fmt = block_fmts[False]
+        self._body_char_fmts = _emphasis_char_formats()
+        self._hdr_char_fmt = self._body_char_fmts[True, False]
+        self._link_char_fmt = _link_char_format()
+        # Bubble inserters indexed by ChatMessage.is_user
+        self._bubble_dispatch = (self._insert_ai_bubble, self._insert_user_bubble)
         
         # Set up UI
         self.setup_ui()
@@ -512,10 +1098,8 @@ class SmartCatAssistantWindow(QMainWindow):
         chat_widget = QWidget()
         chat_layout = QVBoxLayout(chat_widget)
         
-        self.chat_area = QTextEdit()
-        self.chat_area.setReadOnly(True)
-        self.chat_area.setFont(QFont("Consolas", 10))
-        chat_layout.addWidget(self.chat_area)
+        self._chat_layout = chat_layout
+        self._build_chat_view()
         
         splitter.addWidget(chat_widget)
         
@@ -552,6 +1136,54 @@ class SmartCatAssistantWindow(QMainWindow):
         self.progress_bar.setVisible(False)
         main_layout.addWidget(self.progress_bar)
     
+    def _build_chat_view(self):
+        """Create the chat widget selected by the chat_view setting"""
+        chat_view = self.chat_view_name = _cfg("chat_view", "rich")
+        if chat_view == "list":
+            # Virtualized view: only the rows on screen are laid out and painted
+            self.chat_model = ChatListModel(QFont("Consolas", 10), self)
+            self.chat_area = QListView()
+            self.chat_area.setModel(self.chat_model)
+            self.chat_area.setItemDelegate(ChatBubbleDelegate(self.chat_area))
+            self.chat_area.setUniformItemSizes(False)
+            self.chat_area.setResizeMode(QListView.Adjust)
+            # Re-query row heights when the width changes, e.g. as the scrollbar appears
+            self.chat_area.setWordWrap(True)
+            self.chat_area.setLayoutMode(QListView.Batched)
+            self.chat_area.setBatchSize(30)
+            self.chat_area.setVerticalScrollMode(QListView.ScrollPerPixel)
+            self.chat_area.setSelectionMode(QListView.NoSelection)
+        else:
+            self.chat_model = None
+            # QPlainTextEdit lays out blocks much more cheaply than the rich QTextEdit
+            self.chat_area = QPlainTextEdit() if chat_view == "plain" else QTextEdit()
+            self.chat_area.setReadOnly(True)
+            self.chat_area.setFont(QFont("Consolas", 10))
+            # Let Qt evict the oldest blocks itself once the chat grows past the history limit
+            self.chat_area.document().setMaximumBlockCount(_cfg("chat_history_limit", 50) * 4)
+            # Reused for every append instead of fetching a fresh textCursor()
+            self._end_cursor = QTextCursor(self.chat_area.document())
+        # Clicks on "[show full]" links in cropped messages
+        self.chat_area.viewport().installEventFilter(self)
+        
+        # Sticky scrolling: follow new messages unless the user scrolled up to read.
+        # Reacting to rangeChanged avoids forcing a layout just to read maximum()
+        self._follow_chat = False
+        self._chat_reset = True
+        scrollbar = self.chat_area.verticalScrollBar()
+        scrollbar.valueChanged.connect(self._on_chat_scrolled)
+        scrollbar.rangeChanged.connect(self._on_chat_range_changed)
+        self._chat_layout.addWidget(self.chat_area)
+        
+    
+    def _rebuild_chat_view(self):
+        """Swap in a new chat widget after the chat view setting changed"""
+        self._chat_layout.removeWidget(self.chat_area)
+        self.chat_area.deleteLater()
+        if self.chat_model is not None:
+            self.chat_model.deleteLater()
+        self._build_chat_view()
+    
     def load_geometry(self):
         """Load window geometry from config"""
         geometry = config.get_window_geometry()
@@ -580,89 +1212,73 @@ class SmartCatAssistantWindow(QMainWindow):
     
     def show_welcome_message(self):
         """Show welcome message for first-time users"""
-        welcome_text = """
-<div style='background-color: #f0f8ff; padding: 15px; border-radius: 8px; margin: 5px;'>
-<h3>🚀 Welcome to KiCat AI Assistant!</h3>
-<p><strong>Enhanced with Read/Write Access & Memory</strong></p>
-
-<h4>🔧 Setup Required:</h4>
-<ol>
-<li>Click the settings button (⚙) in the top right</li>
-<li>Enter your Claude or OpenAI API key</li>
-<li>Select your preferred model</li>
-<li>Click "Test API Connection" to verify</li>
-<li>Save your settings</li>
-</ol>
-
-<h4>🧠 New Capabilities:</h4>
-<ul>
-<li><strong>Deep PCB Analysis:</strong> Comprehensive design review including signal integrity, power distribution, thermal management</li>
-<li><strong>Design Modifications:</strong> I can make changes to your design (with your permission)</li>
-<li><strong>Memory:</strong> I remember our conversation and previous design decisions</li>
-<li><strong>Manufacturing Expertise:</strong> DFM analysis, assembly considerations, and cost optimization</li>
-<li><strong>Safety Features:</strong> All changes require approval and can be undone</li>
-</ul>
-
-<p>Once configured, I can help you create better PCB designs with intelligent analysis and safe modifications!</p>
-</div>
-        """
-        self.chat_area.setHtml(welcome_text)
+        self.set_chat_html(_WELCOME_HTML)
         self.status_label.setText("Configuration required - Enhanced AI ready")
         self.status_label.setStyleSheet("color: orange;")
     
     def show_ready_message(self):
         """Show ready message when configured"""
-        ready_text = """
-<div style='background-color: #f0fff0; padding: 15px; border-radius: 8px; margin: 5px;'>
-<h3>🤖 KiCat AI Assistant Ready!</h3>
-<p><strong>Enhanced AI with Read/Write Access & Memory</strong></p>
-
-<h4>🔍 I can analyze:</h4>
-<ul>
-<li><strong>Components:</strong> Placement, selection, thermal considerations</li>
-<li><strong>Signal Integrity:</strong> Trace routing, impedance, crosstalk, EMI</li>
-<li><strong>Power Distribution:</strong> PDN analysis, decoupling, voltage regulation</li>
-<li><strong>Manufacturing:</strong> DFM, assembly, cost optimization</li>
-<li><strong>Footprints & Libraries:</strong> Usage analysis and recommendations</li>
-</ul>
-
-<h4>⚡ I can modify your design:</h4>
-<ul>
-<li>Component placement and routing optimization</li>
-<li>Design rule adjustments</li>
-<li>Layer stackup improvements</li>
-<li>All changes require your permission</li>
-<li>Full undo capability</li>
-</ul>
-
-<h4>🧠 Memory Features:</h4>
-<ul>
-<li>Remember our conversation and design decisions</li>
-<li>Track modification history</li>
-<li>Learn your preferences over time</li>
-</ul>
-
-<p><strong>Try asking:</strong> "Analyze my PCB design comprehensively" or "How can I improve signal integrity?"</p>
-</div>
-        """
-        self.chat_area.setHtml(ready_text)
+        self.set_chat_html(_READY_HTML)
         self.status_label.setText("Ready - Enhanced AI with read/write access")
         self.status_label.setStyleSheet("color: green;")
     
+    def set_chat_html(self, html: str):
+        """Replace the whole chat display with a single HTML block"""
+        # Queued bubbles would be wiped by the reset anyway
+        self._pending_messages.clear()
+        self._last_error = None
+        # Show the banner from its top
+        self._follow_chat = False
+        self._chat_reset = True
+        if self.chat_model is not None:
+            self.chat_model.reset_html(html)
+            self.chat_area.scrollToTop()
+        else:
+            if isinstance(self.chat_area, QPlainTextEdit):
+                self.chat_area.clear()
+                self.chat_area.appendHtml(html)
+            else:
+                self.chat_area.setHtml(html)
+            # Re-anchor the append cursor after the banner
+            self._end_cursor.movePosition(QTextCursor.End)
+    
+    @pyqtSlot()
     def show_settings(self):
         """Show settings dialog"""
         dialog = SettingsDialog(self)
         if dialog.exec_() == QDialog.Accepted:
             # Reinitialize client with new settings
             self.ai_client = AIAPIClient()
+            max_history = _cfg("chat_history_limit", 50)
+            if max_history != self.chat_history.maxlen:
+                self.chat_history = deque(self.chat_history, maxlen=max_history)
+            
+            # The window is reused across runs, so apply the flag now rather than on reopen
+            on_top = _cfg("always_on_top", False)
+            if on_top != bool(self.windowFlags() & Qt.WindowStaysOnTopHint):
+                self.setWindowFlag(Qt.WindowStaysOnTopHint, on_top)
+                self.show()  # Changing window flags hides the window
+            
+            rebuild = self.chat_view_name != _cfg("chat_view", "rich")
+            if rebuild:
+                self._rebuild_chat_view()
+            elif self.chat_model is None:
+                self.chat_area.document().setMaximumBlockCount(max_history * 4)
             self.check_configuration()
+            if rebuild:
+                # Carry the conversation over into the new view
+                self._pending_messages.extend(self.chat_history)
+                self._flush_timer.start()
     
+    @pyqtSlot()
+    @qthrottled(timeout=200)
     def refresh_context(self):
         """Manually refresh the design context"""
         try:
             self.show_progress("Analyzing design context...")
             
-            # Get comprehensive context
+            # Get comprehensive context, bypassing the cached copy
+            self.context_parser.bump_cache()
             context = self.context_parser.get_comprehensive_context()
             
             # Show context summary in chat
@@ -683,6 +1299,7 @@ class SmartCatAssistantWindow(QMainWindow):
             self.status_label.setText("Context refresh failed")
             self.status_label.setStyleSheet("color: red;")
     
+    @pyqtSlot()
     def send_message(self):
         """Send user message to AI with enhanced context and permission handling"""
         message = self.input_field.text().strip()
@@ -705,19 +1322,14 @@ class SmartCatAssistantWindow(QMainWindow):
         
         # Get comprehensive context if auto-detect is enabled
         context = ""
-        if config.get("auto_detect_context", True):
+        if _cfg("auto_detect_context", True):
             try:
                 context = self.context_parser.get_comprehensive_context()
             except Exception as e:
                 context = f"Error getting context: {str(e)}"
         
         # Check if this might be a modification request
-        modification_keywords = ['change', 'modify', 'move', 'rotate', 'delete', 'add', 'place', 
-                               'route', 'connect', 'fix', 'improve', 'update', 'replace']
-        
-        is_modification_request = any(keyword in message.lower() for keyword in modification_keywords)
-        
-        if is_modification_request:
+        if _MOD_KEYWORDS_RE.search(message):
             # Add permission notice
             permission_notice = ChatMessage(
                 "🛡️ **Permission System Active**: I'll ask for your approval before making any changes to your design.",
@@ -728,145 +1340,247 @@ class SmartCatAssistantWindow(QMainWindow):
         # Show progress
         self.show_progress("Analyzing design and generating response...")
         
-        # Start chat thread
-        self.chat_thread = ChatThread(self.ai_client, message, context, self)
-        self.chat_thread.response_ready.connect(self.on_response_received)
-        self.chat_thread.error_occurred.connect(self.on_error_occurred)
-        self.chat_thread.start()
+        if QT_NETWORK_AVAILABLE:
+            # Let Qt's event loop drive the HTTP request; the reply is handled on the
+            # thread pool and comes back through the chat signals
+            self.ai_client.send_message_async(
+                message, context,
+                self._chat_signals.response_ready.emit, self._chat_signals.error_occurred.emit,
+                _run_in_pool
+            )
+        else:
+            # Run the request on the shared thread pool
+            runnable = ChatRunnable(self.ai_client, message, context, self._chat_signals)
+            QThreadPool.globalInstance().start(runnable)
     
+    @pyqtSlot(str)
     def on_response_received(self, response: str):
-        """Handle AI response with permission checking"""
-        self.hide_progress()
-        
+        """Handle AI response"""
         # Check if the response contains modification suggestions
-        if self._contains_modification_suggestions(response):
+        if _contains_modification_suggestions(response):
             # Add disclaimer about permissions
-            enhanced_response = response + "\n\n" + permission_manager.generate_safety_summary()
-            
-            # Add assistant message to chat
-            assistant_msg = ChatMessage(enhanced_response, is_user=False)
-            self.add_message_to_chat(assistant_msg)
-        else:
-            # Regular response
-            assistant_msg = ChatMessage(response, is_user=False)
-            self.add_message_to_chat(assistant_msg)
+            response += "\n\n" + permission_manager.generate_safety_summary()
         
-        # Refresh memory panel
-        self.memory_panel.refresh_memory()
+        assistant_msg = ChatMessage(response, is_user=False)
+        self.add_message_to_chat(assistant_msg)
         
-        self.status_label.setText("Ready - Enhanced AI with read/write access")
-        self.status_label.setStyleSheet("color: green;")
-    
-    def _contains_modification_suggestions(self, response: str) -> bool:
-        """Check if response contains modification suggestions"""
-        modification_indicators = [
-            'i can help you', 'let me', 'i would', 'i suggest changing',
-            'modify', 'change', 'move', 'rotate', 'adjust', 'improve',
-            'would you like me to', 'shall i', 'permission to'
-        ]
-        response_lower = response.lower()
-        return any(indicator in response_lower for indicator in modification_indicators)
+        with _updates_paused(self):
+            self.hide_progress()
+            
+            # Refresh memory panel
+            self.memory_panel.refresh_memory()
+            
+            self.status_label.setText("Ready - Enhanced AI with read/write access")
+            self.status_label.setStyleSheet("color: green;")
     
     def add_message_to_chat(self, message: ChatMessage):
         """Add a message to the chat display"""
         self.chat_history.append(message)
         
-        # Limit chat history
-        max_history = config.get("chat_history_limit", 50)
-        if len(self.chat_history) > max_history:
-            self.chat_history = self.chat_history[-max_history:]
-        
-        # Format message
-        if message.is_user:
-            msg_html = f"""
-            <div style='background-color: #e6f3ff; padding: 8px; margin: 5px; border-radius: 5px; border-left: 3px solid #2196f3;'>
-            <strong>You ({message.timestamp}):</strong><br>
-            {self.format_text(message.content)}
-            </div>
-            """
-        else:
-            msg_html = f"""
-            <div style='background-color: #f0f8f0; padding: 8px; margin: 5px; border-radius: 5px; border-left: 3px solid #4caf50;'>
-            <strong>KiCat AI ({message.timestamp}):</strong><br>
-            {self.format_text(message.content)}
-            </div>
-            """
-        
-        # Append to chat area
-        cursor = self.chat_area.textCursor()
-        cursor.movePosition(QTextCursor.End)
-        cursor.insertHtml(msg_html)
-        
-        # Scroll to bottom
-        scrollbar = self.chat_area.verticalScrollBar()
-        scrollbar.setValue(scrollbar.maximum())
+        # Coalesce bursts of messages into one insert on the next event-loop turn
+        self._pending_messages.append(message)
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
     
-    def format_text(self, text: str) -> str:
-        """Format text for HTML display"""
-        # Convert newlines to <br>
-        text = text.replace('\n', '<br>')
+    @pyqtSlot()
+    def _flush_chat(self):
+        """Insert all queued bubbles into the chat view in one go"""
+        if not self._pending_messages:
+            return
+        pending = self._pending_messages
+        self._pending_messages = []
+        
+        # The first messages after a banner always bring the view down to them;
+        # from then on _on_chat_range_changed follows only while at the bottom
+        if self._chat_reset:
+            self._chat_reset = False
+            self._follow_chat = True
+        
+        if self.chat_model is not None:
+            self.chat_model.extend_messages([(m, *self._crop_content(m.content)) for m in pending],
+                                            self.chat_history.maxlen)
+            return
         
-        # Simple markdown-like formatting
-        text = text.replace('**', '<strong>').replace('**', '</strong>')
-        text = text.replace('*', '<em>').replace('*', '</em>')
+        # Append only the new messages; the rest of the document is left untouched.
+        # The cursor stays at the end between flushes: inserts carry it along and
+        # block trimming only removes text before it
+        cursor = self._end_cursor
+        dispatch = self._bubble_dispatch
+        cursor.beginEditBlock()
+        for message in pending:
+            dispatch[message.is_user](cursor, message)
+        cursor.endEditBlock()
+    
+    @pyqtSlot(int)
+    def _on_chat_scrolled(self, value: int):
+        """Keep following new messages only while the view sits at the bottom"""
+        self._follow_chat = value >= self.chat_area.verticalScrollBar().maximum() - 4
+    
+    @pyqtSlot(int, int)
+    def _on_chat_range_changed(self, minimum: int, maximum: int):
+        """Scroll to new content once Qt has laid it out, if we are following"""
+        if self._follow_chat:
+            self.chat_area.verticalScrollBar().setValue(maximum)
+    
+    def _insert_user_bubble(self, cursor: QTextCursor, message: ChatMessage):
+        """Append a user message to the chat as one formatted block"""
+        cursor.insertBlock(self._user_block_fmt, self._body_char_fmts[False, False])
+        cursor.insertText(f"You ({message.timestamp}):", self._hdr_char_fmt)
+        self._insert_bubble_body(cursor, message.content)
+    
+    def _insert_ai_bubble(self, cursor: QTextCursor, message: ChatMessage):
+        """Append an AI message to the chat as one formatted block"""
+        cursor.insertBlock(self._ai_block_fmt, self._body_char_fmts[False, False])
+        cursor.insertText(f"KiCat AI ({message.timestamp}):", self._hdr_char_fmt)
+        self._insert_bubble_body(cursor, message.content)
+    
+    def _insert_bubble_body(self, cursor: QTextCursor, content: str):
+        content, full_id = self._crop_content(content)
+        plain_fmt = self._body_char_fmts[False, False]
+        # Line separators rather than paragraphs keep the message inside its one block
+        cursor.insertText("\u2028", plain_fmt)
+        for run, bold, italic in _emphasis_runs(content):
+            cursor.insertText(run.replace('\n', '\u2028'), self._body_char_fmts[bold, italic])
+        
+        if full_id is not None:
+            link_fmt = QTextCharFormat(self._link_char_fmt)
+            link_fmt.setAnchorHref(f"{_FULLTEXT_SCHEME}{full_id}")
+            cursor.insertText(" … ", plain_fmt)
+            cursor.insertText("[show full]", link_fmt)
+    
+    def _refresh_last_bubble(self, message: ChatMessage):
+        """Redraw the newest bubble after its message was updated in place"""
+        if message in self._pending_messages:
+            return  # Not inserted yet; the flush will use the new content
+        
+        if self.chat_model is not None:
+            index = self.chat_model.update_last_message(*self._crop_content(message.content))
+            self.chat_area.itemDelegate().sizeHintChanged.emit(index)
+            return
         
-        return text
+        # Remove the last block, including the separator before it, and insert it anew
+        cursor = self._end_cursor
+        cursor.beginEditBlock()
+        cursor.movePosition(QTextCursor.StartOfBlock, QTextCursor.KeepAnchor)
+        cursor.movePosition(QTextCursor.PreviousCharacter, QTextCursor.KeepAnchor)
+        cursor.removeSelectedText()
+        self._bubble_dispatch[message.is_user](cursor, message)
+        cursor.endEditBlock()
     
-    def on_response_received(self, response: str):
-        """Handle AI response with permission checking"""
-        self.hide_progress()
+    def _crop_content(self, content: str) -> Tuple[str, Optional[int]]:
+        """Crop message content to bound the layout cost of huge replies.
         
-        # Check if the response contains modification suggestions
-        if self._contains_modification_suggestions(response):
-            # Add disclaimer about permissions
-            enhanced_response = response + "\n\n" + permission_manager.generate_safety_summary()
+        Returns the text to show and, if it was cropped, the id of the stored full text.
+        """
+        full_id = None
+        if len(content) > _MAX_BUBBLE_CHARS:
+            full_id = self._next_full_id
+            self._next_full_id += 1
+            self._full_messages[full_id] = content
+            # Only keep full texts for messages that can still be in the view
+            if len(self._full_messages) > self.chat_history.maxlen:
+                del self._full_messages[next(iter(self._full_messages))]
             
-            # Add assistant message to chat
-            assistant_msg = ChatMessage(enhanced_response, is_user=False)
-            self.add_message_to_chat(assistant_msg)
-        else:
-            # Regular response
-            assistant_msg = ChatMessage(response, is_user=False)
-            self.add_message_to_chat(assistant_msg)
+            content = content[:_MAX_BUBBLE_CHARS]
         
-        # Refresh memory panel
-        self.memory_panel.refresh_memory()
+        if any(len(line) > _MAX_LINE_CHARS for line in content.split('\n')):
+            content = '\n'.join(
+                '\u200b'.join(line[i:i + _MAX_LINE_CHARS] for i in range(0, len(line), _MAX_LINE_CHARS))
+                for line in content.split('\n')
+            )
         
-        self.status_label.setText("Ready - Enhanced AI with read/write access")
-        self.status_label.setStyleSheet("color: green;")
+        return content, full_id
+    
+    def _chat_anchor_at(self, pos) -> str:
+        """Return the link target under a chat viewport position, or an empty string"""
+        if self.chat_model is not None:
+            index = self.chat_area.indexAt(pos)
+            if not index.isValid():
+                return ""
+            return self.chat_area.itemDelegate().anchor_at(index, self.chat_area.visualRect(index), pos)
+        if isinstance(self.chat_area, QPlainTextEdit):
+            return self.chat_area.cursorForPosition(pos).charFormat().anchorHref()
+        return self.chat_area.anchorAt(pos)
     
+    def eventFilter(self, obj, event):
+        if (event.type() == QEvent.MouseButtonRelease
+                and event.button() == Qt.LeftButton
+                and obj is self.chat_area.viewport()):
+            href = self._chat_anchor_at(event.pos())
+            if href.startswith(_FULLTEXT_SCHEME):
+                full_text = self._full_messages.get(int(href[len(_FULLTEXT_SCHEME):]))
+                if full_text is not None:
+                    self.show_full_message(full_text)
+                return True
+        return super().eventFilter(obj, event)
+    
+    def show_full_message(self, text: str):
+        """Open an uncropped message in a plain-text viewer"""
+        dialog = QDialog(self)
+        dialog.setWindowTitle("KiCat AI - Full Message")
+        dialog.setAttribute(Qt.WA_DeleteOnClose)
+        dialog.resize(700, 500)
+        
+        layout = QVBoxLayout(dialog)
+        viewer = QPlainTextEdit()
+        viewer.setReadOnly(True)
+        viewer.setPlainText(text)
+        layout.addWidget(viewer)
+        
+        dialog.open()
+    
+    @pyqtSlot(str)
     def on_error_occurred(self, error: str):
         """Handle error from AI API"""
-        self.hide_progress()
-        
-        error_msg = ChatMessage(f"Error: {error}", is_user=False)
-        self.add_message_to_chat(error_msg)
-        
-        self.status_label.setText("Error occurred")
-        self.status_label.setStyleSheet("color: red;")
+        with _updates_paused(self):
+            self.hide_progress()
+            
+            text = f"Error: {error}"
+            last = self._last_error
+            if (last is not None and last[1] == text
+                    and self.chat_history and self.chat_history[-1] is last[0]):
+                # Retries failing the same way update one bubble instead of piling up
+                error_msg, count = last[0], last[2] + 1
+                error_msg.content = f"{text} (×{count})"
+                error_msg.timestamp = ChatMessage._get_timestamp()
+                self._last_error = (error_msg, text, count)
+                self._refresh_last_bubble(error_msg)
+            else:
+                error_msg = ChatMessage(text, is_user=False)
+                self._last_error = (error_msg, text, 1)
+                self.add_message_to_chat(error_msg)
+            
+            self.status_label.setText("Error occurred")
+            self.status_label.setStyleSheet("color: red;")
     
     def show_progress(self, message: str):
         """Show progress indicator"""
-        self.status_label.setText(message)
-        self.progress_bar.setVisible(True)
-        self.progress_bar.setRange(0, 0)  # Indeterminate progress
-        self.send_button.setEnabled(False)
-        self.input_field.setEnabled(False)
+        with _updates_paused(self):
+            self.status_label.setText(message)
+            self.progress_bar.setRange(0, 0)  # Indeterminate progress
+            self.progress_bar.setVisible(True)
+            self.send_button.setEnabled(False)
+            self.input_field.setEnabled(False)
     
     def hide_progress(self):
         """Hide progress indicator"""
-        self.progress_bar.setVisible(False)
-        self.send_button.setEnabled(True)
-        self.input_field.setEnabled(True)
+        with _updates_paused(self):
+            self.progress_bar.setVisible(False)
+            self.send_button.setEnabled(True)
+            self.input_field.setEnabled(True)
+
+
+# Application found or created by the first ensure_qt_application call
+_APP = None
 
 
 # Ensure QApplication exists
 def ensure_qt_application():
     """Ensure QApplication instance exists"""
-    if not QApplication.instance():
-        app = QApplication(sys.argv)
-        return app
-    return QApplication.instance()
+    global _APP
+    if _APP is None:
+        _APP = QApplication.instance() or QApplication(sys.argv)
+    return _APP
 
 
 if __name__ == "__main__" and PYQT_AVAILABLE: